@@ -0,0 +1,52 @@
+"""
+Settings
+Process-constant environment settings, read and sanitized once instead of on every request
+"""
+
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+
+
+def clean_value(value: str) -> str:
+    """Strip whitespace and surrounding quotes copied in with a credential."""
+    return value.strip().strip('"').strip("'")
+
+
+def clean_env(name: str, default: Optional[str] = None) -> Optional[str]:
+    """Read an env var, stripping whitespace and surrounding quotes copied in from .env files."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return clean_value(value) or default
+
+
+@dataclass(frozen=True)
+class Settings:
+    instagram_user_id: Optional[str]
+    instagram_access_token: Optional[str]
+    public_base_url: str
+    freeimage_api_key: str
+    openrouter_api_key: Optional[str]
+    openrouter_site_url: str
+    openrouter_caption_model: str
+    azure_openai_deployment: str
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Load settings on first use (after main.py has run load_dotenv) and reuse them.
+    Restart the server after editing .env.
+    """
+    return Settings(
+        instagram_user_id=clean_env("INSTAGRAM_USER_ID"),
+        instagram_access_token=clean_env("INSTAGRAM_ACCESS_TOKEN"),
+        public_base_url=clean_env("PUBLIC_BASE_URL", "http://localhost:8000"),
+        freeimage_api_key=clean_env("FREEIMAGE_HOST_API_KEY", "6d207e02198a847aa98d0a27a"),
+        openrouter_api_key=clean_env("OPENROUTER_API_KEY"),
+        openrouter_site_url=clean_env("OPENROUTER_SITE_URL", "http://localhost:3000"),
+        openrouter_caption_model=clean_env("OPENROUTER_MODEL_CAPTION", "openai/gpt-4o-mini"),
+        azure_openai_deployment=clean_env("AZURE_OPENAI_DEPLOYMENT_NAME", "MMNext-gpt-4o"),
+    )
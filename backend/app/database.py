@@ -1,13 +1,45 @@
-from sqlalchemy import create_engine
+import os
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./velvet_queue.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./velvet_queue.db")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if SQLALCHEMY_DATABASE_URL.startswith("sqlite"):
+    # Local file: connections never go stale, so skip the per-checkout ping
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_pre_ping=False
+    )
+
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        """
+        Applied once per pooled connection.
+        WAL lets readers run alongside the scheduler's writes; NORMAL sync is safe under WAL
+        and avoids an fsync per commit; a larger page cache keeps hot tables in memory.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA cache_size=-20000")  # ~20 MB
+        cursor.close()
+else:
+    # Networked DB (e.g. PostgreSQL): size the pool for concurrent requests and
+    # ping/recycle connections the server may have dropped while idle
+    engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "20")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=1800,
+        pool_pre_ping=True
+    )
+
+# expire_on_commit=False: objects stay loaded after commit, so returning them
+# doesn't trigger a SELECT per row (server defaults come back via INSERT ... RETURNING)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
@@ -17,3 +49,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def init_db():
+    """Create any missing tables. Run once per deploy rather than on every worker boot."""
+    from .models import models  # noqa: F401 - registers the tables on Base.metadata
+    Base.metadata.create_all(bind=engine)
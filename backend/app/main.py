@@ -1,42 +1,87 @@
+from dotenv import load_dotenv
+
+# Load environment variables before any app module reads them at import time
+load_dotenv()
+
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine, Base
+from .database import engine, init_db
 from .routers import assets, connectors, posts, ai, comments, profile, approvals
 
 import os
+import atexit
 import logging
-from dotenv import load_dotenv
+import queue
+from logging.handlers import QueueHandler, QueueListener
+import anyio
+import orjson
+
+# Attributes every LogRecord has; anything else on a record came from extra=
+_STANDARD_LOG_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime"}
+
+
+class JSONLogFormatter(logging.Formatter):
+    """One JSON object per record, including any fields passed via extra= (LOG_FORMAT=json)."""
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _STANDARD_LOG_ATTRS)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode()
+
 
-# Configure logging
+# Configure logging. Records are formatted by the caller and handed to a queue; a
+# background listener thread does the console I/O, so a slow stream never blocks a request.
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, logging.StreamHandler())  # Console output
+_log_handler = QueueHandler(_log_queue)
+if os.getenv("LOG_FORMAT", "text").lower() == "json":
+    _log_handler.setFormatter(JSONLogFormatter())
 logging.basicConfig(
-    level=logging.INFO,
+    level=os.getenv("LOG_LEVEL", "INFO").upper(),
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),  # Console output
-    ]
+    handlers=[_log_handler]
 )
+_log_listener.start()
+atexit.register(_log_listener.stop)
 
-# Load environment variables
-load_dotenv()
+# Create tables (dev convenience). In production set AUTO_CREATE_TABLES=false
+# and run `python init_db.py` once per deploy instead.
+if os.getenv("AUTO_CREATE_TABLES", "true").lower() in ["true", "1", "yes"]:
+    init_db()
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson (faster than json.dumps for large lists)."""
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
 
-# Create tables
-Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="VelvetQueue API", version="1.0.0")
+app = FastAPI(title="VelvetQueue API", version="1.0.0", default_response_class=ORJSONResponse)
 
-# CORS
+# CORS: explicit allowlist (comma-separated FRONTEND_ORIGINS) instead of echoing any origin
+frontend_origins = os.getenv("FRONTEND_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], # For dev
+    allow_origins=[origin.strip() for origin in frontend_origins.split(",") if origin.strip()],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+    allow_headers=["Content-Type", "Authorization"],
+    max_age=600,  # Let browsers cache preflight responses
 )
 
-# Mount generated images for frontend access
+# Mount generated images for frontend access.
+# In production set SERVE_STATIC=false and let the reverse proxy serve the directory.
 os.makedirs("generated_images", exist_ok=True)
-app.mount("/generated_images", StaticFiles(directory="generated_images"), name="generated_images")
+if os.getenv("SERVE_STATIC", "true").lower() in ["true", "1", "yes"]:
+    app.mount("/generated_images", StaticFiles(directory="generated_images"), name="generated_images")
 
 # Routers
 app.include_router(assets.router, prefix="/api/assets", tags=["Assets"])
@@ -53,18 +98,34 @@ async def startup_event():
     """Initialize background services on startup"""
     from .services.scheduler import start_scheduler
     
-    # Read scheduler configuration
-    enabled_str = os.getenv("SCHEDULER_ENABLED", "true").lower()
-    enabled = enabled_str in ["true", "1", "yes"]
-    interval_seconds = int(os.getenv("SCHEDULER_INTERVAL_SECONDS", "30"))
+    # Seed the default Instagram channel once, off the GET /api/connectors path
+    connectors.ensure_default_channel()
     
-    if enabled:
-        start_scheduler(app, interval_seconds=interval_seconds)
-        logging.info(f"[STARTUP] Scheduler service started (interval: {interval_seconds}s)")
-    else:
-        logging.info("[STARTUP] Scheduler service disabled (SCHEDULER_ENABLED=false)")
+    # Sync (def) routes run in AnyIO's worker threads, 40 by default. They are short
+    # DB-backed requests (publishing runs as a background task on the event loop), so
+    # threads beyond the connection pool would only queue for a connection; the default
+    # matches DB_POOL_SIZE + DB_MAX_OVERFLOW (20 + 10).
+    anyio.to_thread.current_default_thread_limiter().total_tokens = int(os.getenv("THREADPOOL_SIZE", "30"))
+    
+    # Reads SCHEDULER_ENABLED / SCHEDULER_INTERVAL_SECONDS itself and only starts
+    # in one worker process when running under multiple workers
+    start_scheduler(app)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled outbound HTTP connections"""
+    from .services.http_clients import close_http_clients
+    
+    await close_http_clients()
 
 
 @app.get("/")
 def read_root():
     return {"message": "VelvetQueue Backend is Live"}
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness check with database connection pool usage, for tuning DB_POOL_SIZE / DB_MAX_OVERFLOW."""
+    return {"status": "ok", "db_pool": engine.pool.status()}
@@ -1,7 +1,38 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Text
+from datetime import datetime, timezone
+from typing import Annotated
+from pydantic import PlainSerializer
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Text, Index, cast, exists
+from sqlalchemy.types import TypeDecorator
 from sqlalchemy.orm import relationship, backref
+from sqlalchemy.ext.mutable import MutableDict
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.sql import func
-from ..database import Base
+from ..database import Base, engine
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware UTC datetimes on every backend.
+    SQLite stores no offset and hands back naive values; those are UTC, so mark them as such.
+    Responses then serialize the same "+00:00" form whether a value was just written or read back.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc)
+        return value
+
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
+# Response-model field for UTCDateTime columns. Pydantic would write UTC as "Z"; isoformat()
+# gives the "+00:00" form that endpoints returning ORM objects or dicts already send.
+UTCIsoDatetime = Annotated[datetime, PlainSerializer(lambda value: value.isoformat(), return_type=str, when_used="json")]
 
 class Asset(Base):
     __tablename__ = "assets"
@@ -11,8 +42,9 @@ class Asset(Base):
     asset_type = Column(String, default="image")  # image, video
     prompt = Column(Text, nullable=True)
     tags = Column(JSON, default=list)  # List of tags as strings
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(UTCDateTime(), server_default=func.now())
     meta_data = Column(JSON, default=dict)  # Model used, params, etc.
+    public_url = Column(String, nullable=True)  # Hosted copy of a local file, set on first publish upload
     
     # Lineage for variants
     parent_id = Column(Integer, ForeignKey("assets.id"), nullable=True)
@@ -26,7 +58,12 @@ class Channel(Base):
     name = Column(String, nullable=False)  # Account name
     credentials = Column(JSON, nullable=False)  # Encrypted or just stored for now
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(UTCDateTime(), server_default=func.now())
+    
+    __table_args__ = (
+        # One channel per account name on a platform (connect_channel upserts on this pair)
+        Index("ix_channels_platform_name", "platform", "name", unique=True),
+    )
 
 class Post(Base):
     __tablename__ = "posts"
@@ -35,21 +72,52 @@ class Post(Base):
     content = Column(Text, nullable=True)  # Caption
     media_assets = Column(JSON, default=list)  # List of asset IDs
     status = Column(String, default="draft")  # draft, pending_approval, approved, scheduled, publishing, published, rejected, failed
-    scheduled_time = Column(DateTime(timezone=True), nullable=True)
+    scheduled_time = Column(UTCDateTime(), nullable=True)
     channels = Column(JSON, default=list) # List of channel IDs targetted
-    platform_settings = Column(JSON, default=dict)  # Per platform specific data (captions etc)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    platform_settings = Column(MutableDict.as_mutable(JSON), default=dict)  # Per platform specific data (captions etc); tracks in-place edits
+    created_at = Column(UTCDateTime(), server_default=func.now(), index=True)  # Newest-first listings
     
     # Approval workflow fields
-    approved_at = Column(DateTime(timezone=True), nullable=True)
+    approved_at = Column(UTCDateTime(), nullable=True)
     approved_by = Column(String, nullable=True)
-    rejected_at = Column(DateTime(timezone=True), nullable=True)
+    rejected_at = Column(UTCDateTime(), nullable=True)
     rejected_by = Column(String, nullable=True)
     rejection_reason = Column(Text, nullable=True)
     
     # Scheduling fields
-    last_publish_attempt_at = Column(DateTime(timezone=True), nullable=True)
+    last_publish_attempt_at = Column(UTCDateTime(), nullable=True)
     last_error = Column(Text, nullable=True)
+    
+    __table_args__ = (
+        # post_targets() on PostgreSQL: jsonb @> membership checks use this GIN index
+        # (skipped on SQLite, which has no equivalent for JSON arrays)
+        Index(
+            "ix_posts_channels_gin",
+            cast(channels, JSONB).label("channels_jsonb"),
+            postgresql_using="gin",
+            postgresql_ops={"channels_jsonb": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        # Scheduler due-post lookup: status IN ('scheduled','approved') AND scheduled_time <= now.
+        # Partial on PostgreSQL so it only holds posts still waiting to go out.
+        Index(
+            "ix_posts_status_scheduled",
+            "status",
+            "scheduled_time",
+            postgresql_where=status.in_(("scheduled", "approved")),
+        ),
+    )
+
+
+def post_targets(value):
+    """
+    SQL predicate matching posts whose `channels` JSON array contains `value`.
+    Evaluated by the database (json_each / jsonb @>) so callers don't have to load every post.
+    """
+    if engine.dialect.name == "postgresql":
+        return cast(Post.channels, JSONB).contains([value])
+    entries = func.json_each(Post.channels).table_valued("value")
+    return exists().select_from(entries).where(entries.c.value == value)
+
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -68,5 +136,14 @@ class Comment(Base):
     replied = Column(Boolean, default=False)  # Whether we have replied via API
     hidden = Column(Boolean, default=False)
     deleted = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    created_at = Column(UTCDateTime(), server_default=func.now())
+    updated_at = Column(UTCDateTime(), onupdate=func.now())
+
+    post = relationship("Post")
+
+    __table_args__ = (
+        # get_comments: filter by post, newest first
+        Index("ix_comments_post_created", "post_id", "created_at"),
+        # sync_comments: lookup/upsert by Instagram comment ID
+        Index("ix_comments_platform_extid", "platform", "external_comment_id", unique=True),
+    )
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
-from ..services.ai_assistant import generate_caption, repurpose_caption, suggest_hashtags
+from typing import List, Optional
+from ..services.ai_assistant import build_post_package, generate_caption, repurpose_caption, suggest_hashtags
 
 router = APIRouter()
 
@@ -19,6 +19,12 @@ class HashtagRequest(BaseModel):
     platform: str = "instagram"
     count: int = 10
 
+class PostPackageRequest(BaseModel):
+    prompt: str
+    platforms: List[str] = ["instagram"]
+    tone: str = "professional"
+    hashtag_count: int = 10
+
 @router.post("/generate-caption")
 async def api_generate_caption(request: GenerateCaptionRequest):
     try:
@@ -42,3 +48,14 @@ async def api_suggest_hashtags(request: HashtagRequest):
         return {"success": True, "hashtags": hashtags}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/post-package")
+async def api_post_package(request: PostPackageRequest):
+    """Caption and hashtags for each platform, generated concurrently."""
+    if not request.platforms:
+        raise HTTPException(status_code=400, detail="At least one platform is required")
+    try:
+        package = await build_post_package(request.prompt, request.platforms, request.tone, request.hashtag_count)
+        return {"success": True, "platforms": package}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import models
+from ..services.scheduler import notify_scheduler
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime, timezone
 import logging
 
@@ -28,24 +29,52 @@ class RejectPostRequest(BaseModel):
     reason: str
 
 
+class PendingPostSummary(BaseModel):
+    id: int
+    content: Optional[str] = None
+    status: str
+    media_assets: Optional[List[int]] = None
+    channels: Optional[list] = None
+    scheduled_time: Optional[models.UTCIsoDatetime] = None
+    platform_settings: Optional[dict] = None
+    created_at: Optional[models.UTCIsoDatetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
 # Endpoints
-@router.get("/approvals/pending")
+@router.get("/approvals/pending", response_model=List[PendingPostSummary])
 def get_pending_approvals(
     platform: Optional[str] = None,
     channel_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=200),
+    offset: int = Query(0, ge=0),
     db: Session = Depends(get_db)
 ):
     """
-    Get all posts pending approval.
+    Get posts pending approval, newest first.
     
     Query params:
         platform: Filter by platform (optional)
         channel_id: Filter by channel ID (optional)
+        limit: Page size (default 50)
+        offset: Number of posts to skip (default 0)
     
     Returns:
         List of posts with status="pending_approval"
     """
-    query = db.query(models.Post).filter(models.Post.status == "pending_approval")
+    # Only the columns an approver needs to review the post
+    query = db.query(models.Post).with_entities(
+        models.Post.id,
+        models.Post.content,
+        models.Post.status,
+        models.Post.media_assets,
+        models.Post.channels,
+        models.Post.scheduled_time,
+        models.Post.platform_settings,
+        models.Post.created_at
+    ).filter(models.Post.status == "pending_approval")
     
     # Apply filters if provided
     if platform:
@@ -55,21 +84,14 @@ def get_pending_approvals(
     
     if channel_id:
         # Filter posts that target this channel
-        # Since channels is a JSON list, we need to check if channel_id is in the list
+        # Since channels is a JSON list, the membership check runs in SQL
         logger.info(f"[APPROVALS] Filtering by channel_id: {channel_id}")
-        # Note: SQLAlchemy JSON filtering is database-specific
-        # For simplicity, we'll filter in Python
-        all_posts = query.order_by(
-            models.Post.created_at.desc()
-        ).all()
-        
-        filtered_posts = [p for p in all_posts if channel_id in (p.channels or [])]
-        return filtered_posts
+        query = query.filter(models.post_targets(channel_id))
     
-    # Return all pending approvals ordered by created_at
+    # Return one page of pending approvals ordered by created_at
     return query.order_by(
-        models.Post.created_at.desc()
-    ).all()
+        models.Post.created_at.desc(), models.Post.id.desc()
+    ).offset(offset).limit(limit).all()
 
 
 @router.post("/posts/{post_id}/submit-for-approval")
@@ -88,7 +110,7 @@ def submit_for_approval(
     Returns:
         Updated post object
     """
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -97,13 +119,11 @@ def submit_for_approval(
     
     # Store approval note if provided
     if request.note:
-        post.platform_settings = {
-            **post.platform_settings,
-            "approval_note": request.note
-        }
+        if post.platform_settings is None:
+            post.platform_settings = {}
+        post.platform_settings["approval_note"] = request.note
     
     db.commit()
-    db.refresh(post)
     
     logger.info(f"[APPROVALS] Post {post_id} submitted for approval")
     
@@ -126,7 +146,7 @@ def approve_post(
     Returns:
         Updated post object
     """
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -150,7 +170,7 @@ def approve_post(
         logger.info(f"[APPROVALS] Post {post_id} approved (manual publish required)")
     
     db.commit()
-    db.refresh(post)
+    notify_scheduler()
     
     return post
 
@@ -171,7 +191,7 @@ def reject_post(
     Returns:
         Updated post object
     """
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -182,7 +202,6 @@ def reject_post(
     post.rejection_reason = request.reason
     
     db.commit()
-    db.refresh(post)
     
     logger.info(f"[APPROVALS] Post {post_id} rejected by {request.rejected_by}: {request.reason}")
     
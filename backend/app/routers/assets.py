@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, Form, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import models
-from ..services.image_gen import generate_images_service
-from pydantic import BaseModel
+from ..services.image_gen import MAX_IMAGES_PER_REQUEST, generate_images_service
+from pydantic import BaseModel, Field
 from typing import List, Optional
 import shutil
 import os
@@ -11,11 +12,29 @@ import uuid
 
 router = APIRouter()
 
+# Uploaded files live next to generated images and are served from the same mount
+OUTPUT_DIR = "generated_images"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+# Read/write uploads in 1 MiB chunks
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
 class GenerateRequest(BaseModel):
     prompt: str
-    count: int = 4
+    count: int = Field(4, ge=1, le=MAX_IMAGES_PER_REQUEST)
     model: str = "google/gemini-2.5-flash-image"
 
+class AssetSummary(BaseModel):
+    id: int
+    file_path: str
+    asset_type: Optional[str] = None
+    prompt: Optional[str] = None
+    created_at: Optional[models.UTCIsoDatetime] = None
+    meta_data: Optional[dict] = None
+    
+    class Config:
+        from_attributes = True
+
 @router.post("/generate")
 async def generate_assets(request: GenerateRequest, db: Session = Depends(get_db)):
     try:
@@ -30,20 +49,19 @@ async def generate_assets(request: GenerateRequest, db: Session = Depends(get_db
                 detail="Image generation completed but no images were created. Please try again."
             )
         
-        assets = []
-        for p in paths:
-            asset = models.Asset(
+        assets = [
+            models.Asset(
                 file_path=p,
                 asset_type="image",
                 prompt=request.prompt.strip(),
                 meta_data={"model": request.model, "source": "generated"}
             )
-            db.add(asset)
-            assets.append(asset)
+            for p in paths
+        ]
+        db.add_all(assets)
         
+        # id/created_at are filled in by the INSERT itself; no per-asset refresh needed
         db.commit()
-        for a in assets:
-            db.refresh(a)
         return assets
     except HTTPException:
         raise
@@ -53,22 +71,42 @@ async def generate_assets(request: GenerateRequest, db: Session = Depends(get_db
         logger.exception(f"Error in generate_assets: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to generate assets: {str(e)}")
 
-@router.get("/")
-def get_assets(db: Session = Depends(get_db)):
-    return db.query(models.Asset).order_by(models.Asset.created_at.desc()).all()
+@router.get("/", response_model=List[AssetSummary])
+def get_assets(
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of assets to return"),
+    offset: int = Query(0, ge=0, description="Number of assets to skip"),
+    db: Session = Depends(get_db)
+):
+    # Only the columns the asset closet renders
+    return (
+        db.query(models.Asset)
+        .with_entities(
+            models.Asset.id,
+            models.Asset.file_path,
+            models.Asset.asset_type,
+            models.Asset.prompt,
+            models.Asset.created_at,
+            models.Asset.meta_data
+        )
+        .order_by(models.Asset.created_at.desc(), models.Asset.id.desc())
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
 
 @router.post("/upload")
 async def upload_asset(file: UploadFile = File(...), db: Session = Depends(get_db)):
     try:
-        output_dir = "generated_images"
-        os.makedirs(output_dir, exist_ok=True)
-        
-        ext = file.filename.split(".")[-1] if "." in file.filename else "jpg"
+        ext = os.path.splitext(file.filename)[1].lstrip(".") or "jpg"
         filename = f"upload_{uuid.uuid4().hex}.{ext}"
-        path = os.path.join(output_dir, filename)
+        path = os.path.join(OUTPUT_DIR, filename)
+        
+        # Copy in a worker thread so a large upload doesn't block the event loop
+        def save_upload():
+            with open(path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer, UPLOAD_CHUNK_SIZE)
         
-        with open(path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
+        await run_in_threadpool(save_upload)
             
         asset = models.Asset(
             file_path=path,
@@ -77,14 +115,13 @@ async def upload_asset(file: UploadFile = File(...), db: Session = Depends(get_d
         )
         db.add(asset)
         db.commit()
-        db.refresh(asset)
         return asset
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.delete("/{asset_id}")
 def delete_asset(asset_id: int, db: Session = Depends(get_db)):
-    asset = db.query(models.Asset).filter(models.Asset.id == asset_id).first()
+    asset = db.get(models.Asset, asset_id)
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     
@@ -3,29 +3,47 @@ Comments Router
 Handles comment fetching, analysis, and replying for Instagram posts
 """
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from ..database import get_db
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, joinedload
+from ..database import SessionLocal, get_db
 from ..models import models
 from pydantic import BaseModel
 from typing import List, Optional, Tuple
 from datetime import datetime, timezone
-import os
+from contextlib import aclosing
 import logging
+import threading
 from ..services.instagram_comments import (
-    get_post_comments, 
+    iter_all_comments, 
     reply_to_comment, 
+    reply_to_comments_bulk,
+    hide_comment,
     post_first_comment, 
-    pin_comment,
     set_comments_enabled,
-    set_like_count_hidden
+    HIDE_LIKE_COUNT_SUPPORTED
 )
 
-from ..services.ai_assistant import analyze_comment, generate_comment_reply
+from ..services.credentials import CredentialsError, resolve_credentials
+from ..services.ai_assistant import analyze_comments_batch, analyze_comments_bulk, analyze_and_reply
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Maximum number of comment analyses sent to the AI provider at once
+AI_ANALYSIS_CONCURRENCY = 8
+
+# Most comments read from Instagram per sync (keeps the upsert a bounded single statement)
+COMMENT_SYNC_LIMIT = 1000
+
+# Most comments sent in one re-analysis batch job
+REANALYZE_LIMIT = 10000
+
+# Comment ids already submitted in a running re-analysis batch job (not resubmitted until it ends)
+_reanalyzing_comments: set = set()
+_reanalyzing_lock = threading.Lock()
+
 # Pydantic models
 class CommentOut(BaseModel):
     id: int
@@ -42,8 +60,8 @@ class CommentOut(BaseModel):
     replied: bool
     hidden: bool
     deleted: bool
-    created_at: datetime
-    updated_at: Optional[datetime] = None
+    created_at: models.UTCIsoDatetime
+    updated_at: Optional[models.UTCIsoDatetime] = None
     
     class Config:
         from_attributes = True
@@ -53,6 +71,18 @@ class SuggestReplyRequest(BaseModel):
 
 class ReplyRequest(BaseModel):
     reply_text: str
+    # Return right away and post the reply after the response (no reply_id in the result)
+    background: bool = False
+
+class HideCommentRequest(BaseModel):
+    hidden: bool = True
+
+class BulkReplyItem(BaseModel):
+    comment_id: int
+    reply_text: str
+
+class BulkReplyRequest(BaseModel):
+    replies: List[BulkReplyItem]
 
 class FirstCommentRequest(BaseModel):
     text: str
@@ -69,50 +99,10 @@ def resolve_instagram_credentials(db: Session) -> Tuple[str, str]:
     Returns (user_id, token).
     Raises HTTPException if credentials not found.
     """
-    # Priority: .env file takes precedence
-    env_user_id = os.getenv("INSTAGRAM_USER_ID")
-    env_token = os.getenv("INSTAGRAM_ACCESS_TOKEN")
-    
-    user_id = None
-    token = None
-    
-    if env_user_id and env_token:
-        user_id = env_user_id.strip().strip('"').strip("'")
-        token = env_token.strip().strip('"').strip("'")
-        logger.info(f"[COMMENTS] Using credentials from .env file")
-        
-        # Sync to database channel
-        channel = db.query(models.Channel).filter(models.Channel.platform == "instagram").first()
-        if channel:
-            channel.credentials = {"user_id": user_id, "access_token": token}
-            logger.info(f"[COMMENTS] Updated database channel with .env credentials")
-        else:
-            channel = models.Channel(
-                platform="instagram",
-                name="Default Account",
-                credentials={"user_id": user_id, "access_token": token}
-            )
-            db.add(channel)
-            logger.info(f"[COMMENTS] Created new channel with .env credentials")
-        db.commit()
-    else:
-        # Fall back to database
-        channel = db.query(models.Channel).filter(models.Channel.platform == "instagram").first()
-        if channel and channel.credentials:
-            creds = channel.credentials
-            user_id = creds.get("user_id")
-            token = creds.get("access_token")
-            logger.info(f"[COMMENTS] Using credentials from database channel")
-        else:
-            raise HTTPException(
-                status_code=400,
-                detail="No Instagram credentials found. Please set INSTAGRAM_USER_ID and INSTAGRAM_ACCESS_TOKEN in backend/.env file."
-            )
-    
-    if not user_id or not token:
-        raise HTTPException(status_code=400, detail="Invalid channel credentials")
-    
-    return user_id, token
+    try:
+        return resolve_credentials(db)
+    except CredentialsError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/posts/{post_id}/comments/sync", response_model=List[CommentOut])
@@ -120,10 +110,10 @@ async def sync_comments(post_id: int, db: Session = Depends(get_db)):
     """
     Fetch comments from Instagram for a published post and store them in the database.
     """
-    logger.info(f"[COMMENTS] Syncing comments for post ID: {post_id}")
+    logger.info("[COMMENTS] Syncing comments for post ID: %s", post_id)
     
     # Fetch the post
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -137,66 +127,78 @@ async def sync_comments(post_id: int, db: Session = Depends(get_db)):
             detail="Post has no instagram_media_id; publish it first."
         )
     
-    logger.info(f"[COMMENTS] Instagram media ID: {media_id}")
-    
     # Resolve credentials
     user_id, token = resolve_instagram_credentials(db)
     
     # Fetch comments from Instagram
     try:
-        logger.info(f"[COMMENTS] Fetching comments from Instagram API...")
-        result = get_post_comments(media_id, token, limit=50)
-        comments_data = result.get("data", [])
+        comments_data = []
+        # A manual sync reads straight from Instagram, never from the comment page cache
+        async with aclosing(iter_all_comments(media_id, token, use_cache=False)) as comments_iter:
+            async for comment_data in comments_iter:
+                comments_data.append(comment_data)
+                if len(comments_data) >= COMMENT_SYNC_LIMIT:
+                    break
         
-        logger.info(f"[COMMENTS] Received {len(comments_data)} comments from Instagram")
+        logger.info("[COMMENTS] Received %d comments from Instagram for media %s", len(comments_data), media_id)
         
-        # Process each comment
+        # Build one row per Instagram comment (last occurrence wins on duplicates)
+        rows = {}
         for comment_data in comments_data:
             external_id = comment_data.get("id")
             if not external_id:
                 continue
-            
-            # Check if comment already exists
-            existing = db.query(models.Comment).filter(
+            rows[external_id] = {
+                "post_id": post_id,
+                "platform": "instagram",
+                "external_comment_id": external_id,
+                "parent_external_id": comment_data.get("parent_id"),
+                "author_username": comment_data.get("username"),
+                "text": comment_data.get("text", ""),
+                "sentiment": "unknown",
+                "category": "general",
+            }
+        
+        # Only comments we haven't stored yet need AI analysis
+        existing_ids = {
+            external_id
+            for (external_id,) in db.query(models.Comment.external_comment_id).filter(
                 models.Comment.platform == "instagram",
-                models.Comment.external_comment_id == external_id
-            ).first()
-            
-            if existing:
-                # Update existing comment
-                existing.text = comment_data.get("text", existing.text)
-                existing.author_username = comment_data.get("username") or existing.author_username
-                existing.parent_external_id = comment_data.get("parent_id") or existing.parent_external_id
-                existing.updated_at = datetime.now(timezone.utc)
-                logger.info(f"[COMMENTS] Updated existing comment: {external_id}")
-            else:
-                # Create new comment
-                new_comment = models.Comment(
-                    post_id=post_id,
-                    platform="instagram",
-                    external_comment_id=external_id,
-                    parent_external_id=comment_data.get("parent_id"),
-                    author_username=comment_data.get("username"),
-                    text=comment_data.get("text", ""),
-                    sentiment="unknown",
-                    category="general"
-                )
-                db.add(new_comment)
-                
-                # Analyze new comment with AI
-                if new_comment.text:
-                    try:
-                        analysis = await analyze_comment(new_comment.text)
-                        new_comment.sentiment = analysis.get("sentiment", "unknown")
-                        new_comment.category = analysis.get("category", "general")
-                        logger.info(f"[COMMENTS] Analyzed new comment: sentiment={new_comment.sentiment}, category={new_comment.category}")
-                    except Exception as e:
-                        logger.warning(f"[COMMENTS] Failed to analyze comment: {str(e)}")
-                
-                logger.info(f"[COMMENTS] Created new comment: {external_id}")
+                models.Comment.external_comment_id.in_(list(rows))
+            )
+        } if rows else set()
+        new_rows = [row for external_id, row in rows.items() if external_id not in existing_ids]
+        logger.info("[COMMENTS] %d new, %d existing comments", len(new_rows), len(rows) - len(new_rows))
+        
+        # Analyze new comments with AI concurrently
+        to_analyze = [row for row in new_rows if row["text"]]
+        if to_analyze:
+            analyses = await analyze_comments_bulk(
+                [row["text"] for row in to_analyze],
+                concurrency=AI_ANALYSIS_CONCURRENCY
+            )
+            for row, analysis in zip(to_analyze, analyses):
+                row["sentiment"] = analysis.get("sentiment", "unknown")
+                row["category"] = analysis.get("category", "general")
+            logger.info("[COMMENTS] Analyzed %d new comment(s)", len(to_analyze))
+        
+        # Insert new comments and refresh existing ones in a single statement
+        if rows:
+            dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+            stmt = dialect.insert(models.Comment).values(list(rows.values()))
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["platform", "external_comment_id"],
+                set_={
+                    "text": stmt.excluded.text,
+                    "author_username": func.coalesce(stmt.excluded.author_username, models.Comment.author_username),
+                    "parent_external_id": func.coalesce(stmt.excluded.parent_external_id, models.Comment.parent_external_id),
+                    "updated_at": datetime.now(timezone.utc),
+                }
+            )
+            db.execute(stmt)
         
         db.commit()
-        logger.info(f"[COMMENTS] ✓ Comments synced successfully")
+        logger.info("[COMMENTS] ✓ Comments synced successfully")
         
         # Return all comments for this post
         comments = db.query(models.Comment).filter(
@@ -206,7 +208,7 @@ async def sync_comments(post_id: int, db: Session = Depends(get_db)):
         return comments
         
     except Exception as e:
-        logger.error(f"[COMMENTS] ✗ Error syncing comments: {str(e)}")
+        logger.error("[COMMENTS] ✗ Error syncing comments: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to sync comments: {str(e)}")
 
 
@@ -222,7 +224,7 @@ def get_comments(
     Get stored comments for a post with optional filtering.
     """
     # Verify post exists
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -241,6 +243,62 @@ def get_comments(
     return comments
 
 
+async def reanalyze_comments_in_background(texts: dict):
+    """Classify comments through the Batch API and store the results (runs after the response)."""
+    try:
+        try:
+            results = await analyze_comments_batch(texts)
+        except Exception as e:
+            logger.error("[COMMENTS] ✗ Comment re-analysis batch failed: %s", e)
+            return
+        
+        rows = [
+            {"id": int(comment_id), "sentiment": analysis["sentiment"], "category": analysis["category"]}
+            for comment_id, analysis in results.items()
+            if analysis["sentiment"] != "unknown"
+        ]
+        db = SessionLocal()
+        try:
+            if rows:
+                db.execute(update(models.Comment), rows)
+                db.commit()
+            logger.info("[COMMENTS] ✓ Re-analyzed %d of %d comment(s)", len(rows), len(texts))
+        finally:
+            db.close()
+    finally:
+        with _reanalyzing_lock:
+            _reanalyzing_comments.difference_update(int(comment_id) for comment_id in texts)
+
+
+@router.post("/comments/reanalyze", status_code=202)
+def reanalyze_comments(background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Re-classify stored comments whose analysis is still "unknown".
+    Uses the Batch API (half the cost of online calls), so results can take up to 24 hours.
+    Comments already in a running batch job are skipped; 409 if all of them are.
+    """
+    candidates = db.query(models.Comment.id, models.Comment.text).filter(
+        models.Comment.sentiment == "unknown",
+        models.Comment.deleted == False
+    ).limit(REANALYZE_LIMIT).all()
+    
+    with _reanalyzing_lock:
+        pending = [(comment_id, text) for comment_id, text in candidates if comment_id not in _reanalyzing_comments]
+        _reanalyzing_comments.update(comment_id for comment_id, _ in pending)
+    
+    if candidates and not pending:
+        raise HTTPException(status_code=409, detail="Re-analysis is already running for these comments")
+    
+    if pending:
+        background_tasks.add_task(
+            reanalyze_comments_in_background,
+            {str(comment_id): text for comment_id, text in pending}
+        )
+    logger.info("[COMMENTS] Queued %d comment(s) for batch re-analysis", len(pending))
+    
+    return {"message": "Re-analysis started" if pending else "Nothing to re-analyze", "count": len(pending)}
+
+
 @router.post("/comments/{comment_id}/suggest-reply")
 async def suggest_reply(
     comment_id: int,
@@ -250,32 +308,35 @@ async def suggest_reply(
     """
     Generate an AI-powered reply suggestion for a comment.
     """
-    logger.info(f"[COMMENTS] Generating reply suggestion for comment ID: {comment_id}")
+    logger.info("[COMMENTS] Generating reply suggestion for comment ID: %s", comment_id)
     
-    # Load comment
-    comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
+    # Load comment together with its post (for context) in one query
+    comment = db.get(models.Comment, comment_id, options=[joinedload(models.Comment.post)])
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
-    # Load post for context
-    post = db.query(models.Post).filter(models.Post.id == comment.post_id).first()
+    post = comment.post
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
     try:
-        # Generate reply
-        reply_text = await generate_comment_reply(
+        # Generate reply (the same call re-classifies the comment)
+        result = await analyze_and_reply(
             comment.text,
             post.content,
             tone=request.tone
         )
+        reply_text = result["reply"]
         
-        # Save suggestion
+        # Save suggestion, filling in the analysis if sync couldn't classify it
         comment.ai_reply_text = reply_text
         comment.ai_reply_suggested = True
+        if comment.sentiment == "unknown":
+            comment.sentiment = result["sentiment"]
+            comment.category = result["category"]
         db.commit()
         
-        logger.info(f"[COMMENTS] ✓ Reply suggestion generated")
+        logger.info("[COMMENTS] ✓ Reply suggestion generated")
         
         return {
             "success": True,
@@ -283,23 +344,63 @@ async def suggest_reply(
         }
         
     except Exception as e:
-        logger.error(f"[COMMENTS] ✗ Error generating reply suggestion: {str(e)}")
+        logger.error("[COMMENTS] ✗ Error generating reply suggestion: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to generate reply: {str(e)}")
 
 
+async def reply_in_background(comment_id: int, external_comment_id: str, reply_text: str, token: str):
+    """Post a reply to Instagram and mark the comment replied (runs after the response)."""
+    try:
+        reply_id = await reply_to_comment(external_comment_id, reply_text, token)
+    except Exception as e:
+        logger.error("[COMMENTS] ✗ Background reply to comment ID %s failed: %s", comment_id, e)
+        return
+    
+    db = SessionLocal()
+    try:
+        comment = db.get(models.Comment, comment_id)
+        if comment:
+            comment.replied = True
+            if not comment.ai_reply_text:
+                comment.ai_reply_text = reply_text
+            db.commit()
+        logger.info("[COMMENTS] ✓ Reply posted successfully to Instagram (reply ID: %s)", reply_id)
+    finally:
+        db.close()
+
+
+async def hide_in_background(comment_id: int, external_comment_id: str, hidden: bool, token: str):
+    """Hide or unhide a comment on Instagram; undo the local change if that fails (runs after the response)."""
+    try:
+        await hide_comment(external_comment_id, hidden, token)
+        return
+    except Exception as e:
+        logger.error("[COMMENTS] ✗ Background %s of comment ID %s failed: %s", 'hide' if hidden else 'unhide', comment_id, e)
+    
+    db = SessionLocal()
+    try:
+        db.execute(update(models.Comment), [{"id": comment_id, "hidden": not hidden}])
+        db.commit()
+    finally:
+        db.close()
+
+
 @router.post("/comments/{comment_id}/reply")
-def post_reply(
+async def post_reply(
     comment_id: int,
     request: ReplyRequest,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
     Post a reply to an Instagram comment.
+    With background=true the reply is posted after the response; the comment is
+    marked replied once Instagram accepts it.
     """
-    logger.info(f"[COMMENTS] Posting reply to comment ID: {comment_id}")
+    logger.info("[COMMENTS] Posting reply to comment ID: %s", comment_id)
     
     # Load comment
-    comment = db.query(models.Comment).filter(models.Comment.id == comment_id).first()
+    comment = db.get(models.Comment, comment_id)
     if not comment:
         raise HTTPException(status_code=404, detail="Comment not found")
     
@@ -309,9 +410,17 @@ def post_reply(
     # Resolve credentials
     user_id, token = resolve_instagram_credentials(db)
     
+    if request.background:
+        background_tasks.add_task(reply_in_background, comment.id, comment.external_comment_id, request.reply_text, token)
+        return {
+            "success": True,
+            "queued": True,
+            "reply_id": None
+        }
+    
     try:
         # Post reply to Instagram
-        reply_id = reply_to_comment(comment.external_comment_id, request.reply_text, token)
+        reply_id = await reply_to_comment(comment.external_comment_id, request.reply_text, token)
         
         # Update comment
         comment.replied = True
@@ -319,8 +428,7 @@ def post_reply(
             comment.ai_reply_text = request.reply_text
         db.commit()
         
-        logger.info(f"[COMMENTS] ✓ Reply posted successfully to Instagram")
-        logger.info(f"[COMMENTS] Reply ID: {reply_id}")
+        logger.info("[COMMENTS] ✓ Reply posted successfully to Instagram (reply ID: %s)", reply_id)
         
         return {
             "success": True,
@@ -328,12 +436,91 @@ def post_reply(
         }
         
     except Exception as e:
-        logger.error(f"[COMMENTS] ✗ Error posting reply: {str(e)}")
+        logger.error("[COMMENTS] ✗ Error posting reply: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to post reply: {str(e)}")
 
 
+@router.post("/comments/replies")
+async def post_replies_bulk(
+    request: BulkReplyRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Post replies to several Instagram comments at once.
+    Replies are sent concurrently; each one succeeds or fails on its own.
+    """
+    logger.info("[COMMENTS] Posting %d replies", len(request.replies))
+    
+    comment_ids = [item.comment_id for item in request.replies]
+    comments = {
+        comment.id: comment
+        for comment in db.query(models.Comment).filter(models.Comment.id.in_(comment_ids)).all()
+    }
+    missing = [comment_id for comment_id in comment_ids if comment_id not in comments or not comments[comment_id].external_comment_id]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Comments not found or not on Instagram: {missing}")
+    
+    # Resolve credentials
+    user_id, token = resolve_instagram_credentials(db)
+    
+    results = await reply_to_comments_bulk(
+        [(comments[item.comment_id].external_comment_id, item.reply_text) for item in request.replies],
+        token
+    )
+    
+    response = []
+    for item, result in zip(request.replies, results):
+        if isinstance(result, Exception):
+            response.append({"comment_id": item.comment_id, "success": False, "error": str(result)})
+            continue
+        comment = comments[item.comment_id]
+        comment.replied = True
+        if not comment.ai_reply_text:
+            comment.ai_reply_text = item.reply_text
+        response.append({"comment_id": item.comment_id, "success": True, "reply_id": result})
+    db.commit()
+    
+    logger.info("[COMMENTS] ✓ %d of %d replies posted", sum(r["success"] for r in response), len(response))
+    
+    return {"results": response}
+
+
+@router.post("/comments/{comment_id}/hide", status_code=202)
+def hide_comment_endpoint(
+    comment_id: int,
+    request: HideCommentRequest,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db)
+):
+    """
+    Hide or unhide an Instagram comment.
+    The comment is updated locally right away and on Instagram after the response;
+    if Instagram rejects the change, the local flag is reverted.
+    """
+    comment = db.get(models.Comment, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    
+    if not comment.external_comment_id:
+        raise HTTPException(status_code=400, detail="Comment has no external_comment_id")
+    
+    # Resolve credentials
+    user_id, token = resolve_instagram_credentials(db)
+    
+    comment.hidden = request.hidden
+    db.commit()
+    
+    background_tasks.add_task(hide_in_background, comment.id, comment.external_comment_id, request.hidden, token)
+    logger.info("[COMMENTS] Queued %s of comment ID: %s", 'hide' if request.hidden else 'unhide', comment_id)
+    
+    return {
+        "success": True,
+        "hidden": request.hidden
+    }
+
+
 @router.post("/posts/{post_id}/comments/first")
-def post_first_comment_endpoint(
+async def post_first_comment_endpoint(
     post_id: int,
     request: FirstCommentRequest,
     db: Session = Depends(get_db)
@@ -342,10 +529,10 @@ def post_first_comment_endpoint(
     Post a "first comment" on an Instagram post.
     Useful for "be the first to comment" feature.
     """
-    logger.info(f"[COMMENTS] Posting first comment on post ID: {post_id}")
+    logger.info("[COMMENTS] Posting first comment on post ID: %s", post_id)
     
     # Load post
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -364,7 +551,7 @@ def post_first_comment_endpoint(
     
     try:
         # Post comment
-        comment_id = post_first_comment(media_id, request.text, token)
+        comment_id = await post_first_comment(media_id, request.text, token)
         
         # Optionally store in database
         new_comment = models.Comment(
@@ -380,7 +567,7 @@ def post_first_comment_endpoint(
         db.add(new_comment)
         db.commit()
         
-        logger.info(f"[COMMENTS] ✓ First comment posted successfully")
+        logger.info("[COMMENTS] ✓ First comment posted successfully")
         
         return {
             "success": True,
@@ -389,12 +576,12 @@ def post_first_comment_endpoint(
         }
         
     except Exception as e:
-        logger.error(f"[COMMENTS] ✗ Error posting first comment: {str(e)}")
+        logger.error("[COMMENTS] ✗ Error posting first comment: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to post first comment: {str(e)}")
 
 
 @router.post("/posts/{post_id}/comments/settings")
-def update_comment_settings(
+async def update_comment_settings(
     post_id: int,
     request: CommentSettingsRequest,
     db: Session = Depends(get_db)
@@ -405,10 +592,10 @@ def update_comment_settings(
     Note: Some settings may not be supported by Instagram Graph API.
     Returns which settings were successfully applied.
     """
-    logger.info(f"[COMMENTS] Updating comment settings for post ID: {post_id}")
+    logger.info("[COMMENTS] Updating comment settings for post ID: %s", post_id)
     
     # Load post
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -434,29 +621,20 @@ def update_comment_settings(
     # Try to set comments enabled/disabled
     if request.comments_enabled is not None:
         try:
-            supported = set_comments_enabled(media_id, request.comments_enabled, token)
+            supported = await set_comments_enabled(media_id, request.comments_enabled, token)
             results["supported"]["comments_enabled"] = supported
             if supported:
                 results["messages"].append(f"Comments {'enabled' if request.comments_enabled else 'disabled'} successfully")
             else:
                 results["messages"].append("Comments toggle not supported after publishing (must be set during creation)")
         except Exception as e:
-            logger.error(f"[COMMENTS] Error setting comments enabled: {str(e)}")
+            logger.error("[COMMENTS] Error setting comments enabled: %s", e)
             results["supported"]["comments_enabled"] = False
             results["messages"].append(f"Failed to toggle comments: {str(e)}")
     
-    # Try to set like count hidden
+    # Like count visibility can't be changed through the Graph API
     if request.hide_like_count is not None:
-        try:
-            supported = set_like_count_hidden(media_id, request.hide_like_count, token)
-            results["supported"]["hide_like_count"] = supported
-            if supported:
-                results["messages"].append(f"Like count {'hidden' if request.hide_like_count else 'shown'} successfully")
-            else:
-                results["messages"].append("Hide like count not supported via API (must be configured in Instagram app)")
-        except Exception as e:
-            logger.error(f"[COMMENTS] Error setting like count visibility: {str(e)}")
-            results["supported"]["hide_like_count"] = False
-            results["messages"].append(f"Failed to toggle like count: {str(e)}")
+        results["supported"]["hide_like_count"] = HIDE_LIKE_COUNT_SUPPORTED
+        results["messages"].append("Hide like count not supported via API (must be configured in Instagram app)")
     
     return results
@@ -1,9 +1,15 @@
 from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..config import clean_value, get_settings
+from ..database import SessionLocal, get_db
 from ..models import models
-from pydantic import BaseModel
-import os
+from ..services.response_cache import cached_response
+from ..services.credentials import invalidate_credentials
+from pydantic import BaseModel, field_validator
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -12,25 +18,49 @@ class ConnectRequest(BaseModel):
     name: str 
     user_id: str
     access_token: str
+    
+    # Cleaned once on the way in, so publishing uses stored credentials as-is
+    @field_validator("user_id", "access_token")
+    @classmethod
+    def _clean_credential(cls, value: str) -> str:
+        return clean_value(value)
 
 @router.get("/")
+@cached_response("channels:list")
 def get_channels(db: Session = Depends(get_db)):
-    channels = db.query(models.Channel).all()
-    # If no channels and .env has credentials, insert default Instagram
-    if not channels:
-        uid = os.getenv("INSTAGRAM_USER_ID")
-        token = os.getenv("INSTAGRAM_ACCESS_TOKEN")
-        if uid and token:
-            default_ch = models.Channel(
-                platform="instagram",
-                name="Default Account", 
-                credentials={"user_id": uid, "access_token": token}
-            )
-            db.add(default_ch)
-            db.commit()
-            db.refresh(default_ch)
-            return [default_ch]
-    return channels
+    # Read-only: the default channel is seeded at startup by ensure_default_channel()
+    return db.query(models.Channel).all()
+
+def ensure_default_channel():
+    """
+    Insert the default Instagram channel from .env credentials when no channels exist.
+    Runs once at startup; ON CONFLICT on the unique (platform, name) index keeps
+    concurrent workers from inserting it twice.
+    """
+    settings = get_settings()
+    if not (settings.instagram_user_id and settings.instagram_access_token):
+        return
+    
+    db = SessionLocal()
+    try:
+        if db.query(models.Channel.id).first():
+            return
+        
+        dialect = postgresql if db.bind.dialect.name == "postgresql" else sqlite
+        stmt = dialect.insert(models.Channel).values(
+            platform="instagram",
+            name="Default Account",
+            credentials={"user_id": settings.instagram_user_id, "access_token": settings.instagram_access_token},
+            is_active=True
+        ).on_conflict_do_nothing(index_elements=["platform", "name"])
+        db.execute(stmt)
+        db.commit()
+        logger.info("[CONNECTORS] Ensured default Instagram channel from .env credentials")
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[CONNECTORS] Could not create default channel: {e}")
+    finally:
+        db.close()
 
 @router.post("/connect")
 def connect_channel(req: ConnectRequest, db: Session = Depends(get_db)):
@@ -38,7 +68,7 @@ def connect_channel(req: ConnectRequest, db: Session = Depends(get_db)):
     if existing:
         existing.credentials = {"user_id": req.user_id, "access_token": req.access_token}
         db.commit()
-        db.refresh(existing)
+        invalidate_credentials()
         return existing
         
     ch = models.Channel(
@@ -48,5 +78,5 @@ def connect_channel(req: ConnectRequest, db: Session = Depends(get_db)):
     )
     db.add(ch)
     db.commit()
-    db.refresh(ch)
+    invalidate_credentials()
     return ch
@@ -1,16 +1,22 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+from sqlalchemy import or_, update
 from sqlalchemy.orm import Session
 from ..database import get_db
 from ..models import models
+from ..services.response_cache import cached_response
+from ..services.scheduler import notify_scheduler, stale_publishing
 from pydantic import BaseModel
 from typing import List, Optional
 from datetime import datetime, date, timezone
+from zoneinfo import ZoneInfo
 import logging
-import pytz
 
 # Define logger
 logger = logging.getLogger(__name__)
 
+# Timezone assumed for naive datetimes from the frontend (loaded once)
+LOCAL_TZ = ZoneInfo("Asia/Kolkata")
+
 # Timezone helper
 def normalize_to_utc(dt: datetime) -> datetime:
     """
@@ -20,8 +26,7 @@ def normalize_to_utc(dt: datetime) -> datetime:
     """
     if dt.tzinfo is None:
         # Assume IST for naive datetimes from frontend
-        local_tz = pytz.timezone("Asia/Kolkata")
-        dt = local_tz.localize(dt)
+        dt = dt.replace(tzinfo=LOCAL_TZ)
     return dt.astimezone(timezone.utc)
 
 router = APIRouter()
@@ -41,6 +46,19 @@ class PostUpdate(BaseModel):
     scheduled_time: Optional[datetime] = None
     platform_settings: Optional[dict] = None
 
+class PostListItem(BaseModel):
+    id: int
+    content: Optional[str] = None
+    status: str
+    media_assets: Optional[List[int]] = None
+    channels: Optional[list] = None
+    scheduled_time: Optional[models.UTCIsoDatetime] = None
+    created_at: Optional[models.UTCIsoDatetime] = None
+    last_error: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
 class ScheduleRequest(BaseModel):
     scheduled_time: datetime
     status: Optional[str] = "scheduled"  # must be "scheduled" or "approved"
@@ -57,17 +75,30 @@ def create_post(post: PostCreate, db: Session = Depends(get_db)):
     )
     db.add(db_post)
     db.commit()
-    db.refresh(db_post)
+    if db_post.scheduled_time is not None:
+        notify_scheduler()
     return {"id": db_post.id, "message": "Post created successfully"}
 
-@router.get("/")
+@router.get("/", response_model=List[PostListItem])
+@cached_response("posts:list")
 def get_posts(status: Optional[str] = None, db: Session = Depends(get_db)):
-    query = db.query(models.Post)
+    # List view: skip approval audit fields and platform_settings (use GET /{post_id} for the full post)
+    query = db.query(models.Post).with_entities(
+        models.Post.id,
+        models.Post.content,
+        models.Post.status,
+        models.Post.media_assets,
+        models.Post.channels,
+        models.Post.scheduled_time,
+        models.Post.created_at,
+        models.Post.last_error
+    )
     if status and status != "all":
         query = query.filter(models.Post.status == status)
     return query.order_by(models.Post.scheduled_time.asc(), models.Post.created_at.desc()).all()
 
 @router.get("/calendar", response_model=List[dict])
+@cached_response("posts:calendar")
 def get_calendar_posts(
     start_date: date,
     end_date: date,
@@ -82,7 +113,15 @@ def get_calendar_posts(
     start_dt = datetime.combine(start_date, datetime.min.time())
     end_dt = datetime.combine(end_date, datetime.max.time())
     
-    query = db.query(models.Post).filter(
+    query = db.query(models.Post).with_entities(
+        models.Post.id,
+        models.Post.content,
+        models.Post.status,
+        models.Post.scheduled_time,
+        models.Post.channels,
+        models.Post.platform_settings,
+        models.Post.last_error
+    ).filter(
         models.Post.scheduled_time.isnot(None),
         models.Post.scheduled_time >= start_dt,
         models.Post.scheduled_time <= end_dt
@@ -108,62 +147,86 @@ def get_calendar_posts(
 
 @router.get("/{post_id}")
 def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     return post
 
 @router.put("/{post_id}")
 def update_post(post_id: int, updates: PostUpdate, db: Session = Depends(get_db)):
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    update_data = updates.model_dump(exclude_unset=True)
+    if not update_data:
+        post = db.get(models.Post, post_id)
+    else:
+        # Single UPDATE ... RETURNING instead of SELECT + attribute changes + flush
+        post = db.execute(
+            update(models.Post)
+            .where(models.Post.id == post_id)
+            .values(**update_data)
+            .returning(models.Post)
+        ).scalar_one_or_none()
+    
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
-    update_data = updates.dict(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(post, key, value)
-    
     db.commit()
-    db.refresh(post)
+    if "status" in update_data or "scheduled_time" in update_data:
+        notify_scheduler()
     return post
 
-@router.post("/{post_id}/publish")
-def publish_post(post_id: int, db: Session = Depends(get_db)):
-    from ..services.scheduler import publish_post_now
+@router.post("/{post_id}/publish", status_code=202)
+def publish_post(post_id: int, background_tasks: BackgroundTasks, db: Session = Depends(get_db)):
+    """
+    Queue a post for immediate publishing and return right away.
+    The Instagram upload/publish runs after the response; poll GET /api/posts/{post_id}
+    until status is "published" (media ID in platform_settings) or "failed" (see last_error).
+    """
+    from ..services.scheduler import publish_post_in_background
     
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    logger.info("[POST PUBLISH] Manual publish requested for post ID: %s", post_id)
     
-    logger.info(f"[POST PUBLISH] Manual publish requested for post ID: {post_id}")
+    # Claim the post atomically: mark it publishing unless it already is (or is published),
+    # so a second click can't queue a second publish while the first is still running.
+    # Publishing status also keeps the scheduler from picking it up. A publish abandoned
+    # by a crash or restart goes stale and can be claimed again.
+    now = datetime.now(timezone.utc)
+    claimed = db.execute(
+        update(models.Post)
+        .where(
+            models.Post.id == post_id,
+            or_(models.Post.status.not_in(("publishing", "published")), stale_publishing(now))
+        )
+        .values(status="publishing", last_publish_attempt_at=now, last_error=None)
+        .returning(models.Post.id)
+    ).first()
+    db.commit()
     
-    try:
-        # Use the shared helper which handles idempotency, credentials, and image hosting
-        media_id = publish_post_now(db, post)
-        
+    if claimed is None:
+        post = db.get(models.Post, post_id)
+        if not post:
+            raise HTTPException(status_code=404, detail="Post not found")
+        if post.status == "publishing":
+            raise HTTPException(status_code=409, detail="Post is already being published")
         return {
-            "message": "Post published successfully to Instagram",
-            "status": "published",
-            "media_id": media_id
+            "message": "Post is already published",
+            "status": post.status,
+            "media_id": (post.platform_settings or {}).get("instagram_media_id")
         }
-    except Exception as e:
-        error_message = str(e)
-        logger.error(f"[POST PUBLISH] ✗ Failed: {error_message}")
-        
-        # Provide more helpful error messages
-        if "expired" in error_message.lower() or "token" in error_message.lower():
-            detail_message = f"{error_message}\n\nTo fix this:\n1. Go to https://developers.facebook.com/tools/explorer/\n2. Generate a new long-lived access token\n3. Update INSTAGRAM_ACCESS_TOKEN in backend/.env file\n4. Restart the backend server"
-        else:
-            detail_message = error_message
-        
-        raise HTTPException(status_code=500, detail=detail_message)
+    
+    background_tasks.add_task(publish_post_in_background, post_id)
+    
+    return {
+        "message": "Publishing started",
+        "status": "publishing",
+        "media_id": None
+    }
 
 @router.post("/{post_id}/schedule", response_model=dict)
 def schedule_post(post_id: int, body: ScheduleRequest, db: Session = Depends(get_db)):
     """
     Schedule a post for future publishing.
     """
-    post = db.query(models.Post).filter(models.Post.id == post_id).first()
+    post = db.get(models.Post, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
     
@@ -182,10 +245,10 @@ def schedule_post(post_id: int, body: ScheduleRequest, db: Session = Depends(get
     post.last_error = None  # Clear any previous errors
     
     db.commit()
-    db.refresh(post)
+    notify_scheduler()
     
     # FIXED: logger is now defined so this won't crash
-    logger.info(f"[SCHEDULE] Post {post_id} scheduled for {utc_scheduled_time.isoformat()} (UTC) - original input: {body.scheduled_time}")
+    logger.info("[SCHEDULE] Post %s scheduled for %s (UTC) - original input: %s", post_id, utc_scheduled_time, body.scheduled_time)
     
     return {
         "id": post.id,
@@ -4,18 +4,58 @@ Handles profile overview and post listing per platform/channel
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
+from ..config import get_settings
 from ..database import get_db
 from ..models import models
+from ..services.response_cache import cached_response
 from typing import Optional, List
 import logging
-import os
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+def channel_posts_filter(channel: models.Channel, platform: str):
+    """
+    SQL filter for posts targeting a channel.
+    Posts store channel IDs in the 'channels' JSON array; older posts stored platform strings.
+    """
+    return or_(models.post_targets(channel.id), models.post_targets(platform))
+
+
+def get_thumbnail_urls(db: Session, posts: list) -> dict:
+    """
+    Map post ID -> thumbnail URL (from the post's first asset).
+    Loads every thumbnail asset in a single IN query instead of one query per post.
+    """
+    first_asset_ids = {post.id: post.media_assets[0] for post in posts if post.media_assets}
+    if not first_asset_ids:
+        return {}
+    
+    asset_paths = dict(
+        db.query(models.Asset.id, models.Asset.file_path)
+        .filter(models.Asset.id.in_(set(first_asset_ids.values())))
+        .all()
+    )
+    
+    public_base = get_settings().public_base_url
+    thumbnails = {}
+    for post_id, asset_id in first_asset_ids.items():
+        file_path = asset_paths.get(asset_id)
+        if not file_path:
+            continue
+        # Convert file path to URL (local files are served from PUBLIC_BASE_URL)
+        if file_path.startswith("http"):
+            thumbnails[post_id] = file_path
+        else:
+            thumbnails[post_id] = f"{public_base}/{file_path}"
+    return thumbnails
+
+
 @router.get("/overview")
+@cached_response("profile:overview")
 def get_profile_overview(
     platform: str = Query(..., description="Platform name (e.g., 'instagram', 'linkedin', 'twitter')"),
     channel_id: Optional[int] = Query(None, description="Specific channel ID (optional)"),
@@ -56,44 +96,32 @@ def get_profile_overview(
     
     logger.info(f"[PROFILE] Using channel: {channel.name} (ID: {channel.id})")
     
-    # Get posts targeting this channel
-    # Posts store channel IDs in the 'channels' JSON array
-    all_posts = db.query(models.Post).all()
-    
-    # Filter posts that target this channel
-    channel_posts = []
-    for post in all_posts:
-        if isinstance(post.channels, list) and channel.id in post.channels:
-            channel_posts.append(post)
-        # Also include posts that use platform strings (backwards compatibility)
-        elif isinstance(post.channels, list) and platform in post.channels:
-            channel_posts.append(post)
+    # Get posts targeting this channel (filtered, counted and limited in SQL)
+    posts_filter = channel_posts_filter(channel, platform)
     
-    total_posts = len(channel_posts)
-    published_posts = len([p for p in channel_posts if p.status in ["published", "posted"]])
+    total_posts, published_posts = db.query(
+        func.count(models.Post.id),
+        func.count(models.Post.id).filter(models.Post.status.in_(["published", "posted"]))
+    ).filter(posts_filter).one()
     
     logger.info(f"[PROFILE] Found {total_posts} total posts, {published_posts} published")
     
     # Get latest 12 posts
-    latest_posts = sorted(channel_posts, key=lambda p: p.created_at, reverse=True)[:12]
+    latest_posts = db.query(models.Post).with_entities(
+        models.Post.id,
+        models.Post.content,
+        models.Post.status,
+        models.Post.media_assets,
+        models.Post.platform_settings,
+        models.Post.created_at
+    ).filter(posts_filter).order_by(
+        models.Post.created_at.desc(), models.Post.id.desc()
+    ).limit(12).all()
     
     # Build post data with thumbnails
+    thumbnails = get_thumbnail_urls(db, latest_posts)
     posts_data = []
     for post in latest_posts:
-        # Get thumbnail from first asset
-        thumbnail_url = None
-        if post.media_assets and len(post.media_assets) > 0:
-            asset_id = post.media_assets[0]
-            asset = db.query(models.Asset).filter(models.Asset.id == asset_id).first()
-            if asset:
-                # Convert file path to URL
-                if asset.file_path.startswith("http"):
-                    thumbnail_url = asset.file_path
-                else:
-                    # Local file - construct URL
-                    public_base = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
-                    thumbnail_url = f"{public_base}/{asset.file_path}"
-        
         # Get published_at from platform_settings if available
         published_at = None
         if isinstance(post.platform_settings, dict):
@@ -103,9 +131,9 @@ def get_profile_overview(
             "post_id": post.id,
             "caption": post.content or "",
             "status": post.status,
-            "created_at": post.created_at.isoformat() if post.created_at else None,
+            "created_at": post.created_at,
             "published_at": published_at,
-            "thumbnail_url": thumbnail_url
+            "thumbnail_url": thumbnails.get(post.id)
         })
     
     return {
@@ -153,49 +181,34 @@ def get_profile_posts(
         if not channel:
             raise HTTPException(status_code=404, detail=f"No active channel found for platform {platform}")
     
-    # Get all posts and filter
-    all_posts = db.query(models.Post).all()
-    
-    channel_posts = []
-    for post in all_posts:
-        if isinstance(post.channels, list) and channel.id in post.channels:
-            channel_posts.append(post)
-        # Backwards compatibility with platform strings
-        elif isinstance(post.channels, list) and platform in post.channels:
-            channel_posts.append(post)
-    
-    # Sort by created_at descending
-    channel_posts.sort(key=lambda p: p.created_at, reverse=True)
-    
-    # Pagination
-    total = len(channel_posts)
-    start_idx = (page - 1) * page_size
-    end_idx = start_idx + page_size
-    paginated_posts = channel_posts[start_idx:end_idx]
+    # Filter, sort and paginate in SQL
+    query = db.query(models.Post).filter(channel_posts_filter(channel, platform))
+    total = query.count()
+    
+    paginated_posts = query.with_entities(
+        models.Post.id,
+        models.Post.content,
+        models.Post.status,
+        models.Post.media_assets,
+        models.Post.scheduled_time,
+        models.Post.platform_settings,
+        models.Post.created_at
+    ).order_by(
+        models.Post.created_at.desc(), models.Post.id.desc()
+    ).offset((page - 1) * page_size).limit(page_size).all()
     
     # Build response
+    thumbnails = get_thumbnail_urls(db, paginated_posts)
     posts_data = []
     for post in paginated_posts:
-        # Get thumbnail
-        thumbnail_url = None
-        if post.media_assets and len(post.media_assets) > 0:
-            asset_id = post.media_assets[0]
-            asset = db.query(models.Asset).filter(models.Asset.id == asset_id).first()
-            if asset:
-                if asset.file_path.startswith("http"):
-                    thumbnail_url = asset.file_path
-                else:
-                    public_base = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
-                    thumbnail_url = f"{public_base}/{asset.file_path}"
-        
         posts_data.append({
             "id": post.id,
             "content": post.content or "",
             "status": post.status,
-            "scheduled_time": post.scheduled_time.isoformat() if post.scheduled_time else None,
-            "created_at": post.created_at.isoformat() if post.created_at else None,
+            "scheduled_time": post.scheduled_time,
+            "created_at": post.created_at,
             "platform_settings": post.platform_settings or {},
-            "thumbnail_url": thumbnail_url
+            "thumbnail_url": thumbnails.get(post.id)
         })
     
     return {
@@ -1,44 +1,150 @@
 import os
-import json
+import asyncio
+import hashlib
+import math
 import re
-from typing import Optional, Dict, Any
-from openai import AzureOpenAI, OpenAI
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, List
+from openai import AsyncAzureOpenAI, AsyncOpenAI
+import orjson
 import logging
+from ..config import get_settings
+from .http_clients import get_async_http_client
 
 logger = logging.getLogger(__name__)
 
+# Comments with no letters or digits (emoji reactions, "!!!") carry no text worth an LLM call
+NON_TEXT_COMMENT = re.compile(r"^[\W_]+$")
+
+# Recent AI results (comment analyses, hashtag suggestions); the same comments and
+# hashtag requests recur constantly. Bump PROMPT_VERSION when prompts change.
+CACHE_DISABLED = os.getenv("CACHE_DISABLED", "false").lower() in ["true", "1", "yes"]
+AI_CACHE_SIZE = 10_000
+AI_CACHE_TTL_SECONDS = 3600
+PROMPT_VERSION = "v4"
+_ai_cache: "OrderedDict[str, tuple]" = OrderedDict()
+
+
+def _cache_key(*parts) -> str:
+    """Hash the model, prompt version and inputs into a fixed-size cache key."""
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()
+
+
+def _cache_get(key: str):
+    """Return a cached result, or None if missing, expired or caching is disabled."""
+    if CACHE_DISABLED:
+        return None
+    entry = _ai_cache.get(key)
+    if entry is None:
+        return None
+    expires, value = entry
+    if expires <= time.monotonic():
+        del _ai_cache[key]
+        return None
+    _ai_cache.move_to_end(key)
+    return value
+
+
+def _cache_put(key: str, value) -> None:
+    """Store a result, evicting the least recently used entries beyond AI_CACHE_SIZE."""
+    if CACHE_DISABLED:
+        return
+    _ai_cache[key] = (time.monotonic() + AI_CACHE_TTL_SECONDS, value)
+    _ai_cache.move_to_end(key)
+    while len(_ai_cache) > AI_CACHE_SIZE:
+        _ai_cache.popitem(last=False)
+
+
+# Suggested replies, bucketed by post caption and tone. Near-duplicate comments on the
+# same post ("Love this!", "love this!!") reuse a reply instead of another LLM call.
+REPLY_CACHE_TTL_SECONDS = 7 * 24 * 3600
+REPLY_CACHE_BUCKETS = 1000
+REPLY_CACHE_BUCKET_SIZE = 200
+REPLY_SIMILARITY_THRESHOLD = 0.92
+# Optional Azure embedding deployment (e.g. text-embedding-3-small); without it only
+# comments that normalize to the same text share a reply
+EMBEDDING_DEPLOYMENT = os.getenv("AZURE_OPENAI_EMBEDDING_DEPLOYMENT")
+_reply_cache: "OrderedDict[str, list]" = OrderedDict()
+
+
+def _normalize_comment(text: str) -> str:
+    """Lowercase and drop punctuation so trivially different comments match."""
+    normalized = " ".join(re.sub(r"[\W_]+", " ", text.lower()).split())
+    # Emoji-only comments have no words left; keep them distinct ("🔥" is not "😢")
+    return normalized or text.strip()
+
+
+async def _embed_comment(text: str) -> Optional[List[float]]:
+    """Return a unit-length embedding for a comment, or None when embeddings are unavailable."""
+    if not EMBEDDING_DEPLOYMENT:
+        return None
+    try:
+        response = await get_azure_client().embeddings.create(model=EMBEDDING_DEPLOYMENT, input=text)
+    except Exception as e:
+        logger.warning(f"Comment embedding error, using exact reply matching: {e}")
+        return None
+    vector = response.data[0].embedding
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def _find_cached_reply(bucket_key: str, normalized: str, vector: Optional[List[float]] = None) -> Optional[Dict[str, str]]:
+    """Look up the analysis and reply for an identical comment, or a similar one when a vector is given."""
+    bucket = _reply_cache.get(bucket_key)
+    if not bucket:
+        return None
+    now = time.monotonic()
+    bucket[:] = [entry for entry in bucket if entry[0] > now]
+    _reply_cache.move_to_end(bucket_key)
+    
+    for _, cached_text, cached_vector, result in bucket:
+        if cached_text == normalized:
+            return result
+        if vector is not None and cached_vector is not None:
+            # Vectors are unit length, so the dot product is the cosine similarity
+            if sum(a * b for a, b in zip(vector, cached_vector)) >= REPLY_SIMILARITY_THRESHOLD:
+                return result
+    return None
+
+
+def _store_reply(bucket_key: str, normalized: str, vector: Optional[List[float]], result: Dict[str, str]) -> None:
+    bucket = _reply_cache.setdefault(bucket_key, [])
+    bucket.append((time.monotonic() + REPLY_CACHE_TTL_SECONDS, normalized, vector, result))
+    del bucket[:-REPLY_CACHE_BUCKET_SIZE]
+    _reply_cache.move_to_end(bucket_key)
+    while len(_reply_cache) > REPLY_CACHE_BUCKETS:
+        _reply_cache.popitem(last=False)
+
+@lru_cache(maxsize=1)
 def get_azure_client():
-    """Initialize Azure OpenAI client for comment analysis."""
-    return AzureOpenAI(
+    """Async Azure OpenAI client for comment analysis (created once, shares the pooled HTTP client)."""
+    return AsyncAzureOpenAI(
         azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
         api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview")
+        api_version=os.getenv("AZURE_OPENAI_API_VERSION", "2025-01-01-preview"),
+        http_client=get_async_http_client()
     )
 
+@lru_cache(maxsize=1)
 def get_openrouter_client():
-    """Initialize OpenRouter client for caption generation."""
-    api_key = os.getenv("OPENROUTER_API_KEY")
+    """Async OpenRouter client for caption generation (created once, shares the pooled HTTP client)."""
+    api_key = get_settings().openrouter_api_key
     if not api_key:
         raise ValueError("OPENROUTER_API_KEY environment variable is not set")
     
-    return OpenAI(
+    return AsyncOpenAI(
         base_url="https://openrouter.ai/api/v1",
-        api_key=api_key
+        api_key=api_key,
+        http_client=get_async_http_client()
     )
 
-async def generate_caption(prompt: str, platform: str = "instagram", tone: str = "professional") -> str:
-    """
-    Generate a social media caption using OpenRouter.
-    """
-    try:
-        client = get_openrouter_client()
-        model = os.getenv("OPENROUTER_MODEL_CAPTION", "openai/gpt-4o-mini")
-        
-        system_prompt = f"""You are a social media content expert. Generate engaging {platform} captions.
-        
+# System prompts are fixed strings so every request shares the same prefix, which the
+# provider can cache; per-request values (platform, tone, caption) go in the user message
+SYSTEM_CAPTION = """You are a social media content expert. Generate engaging captions for the platform and tone given by the user.
+
 Rules:
-- Platform: {platform}
-- Tone: {tone}
 - Write a complete caption based on the user's input.
 - Include relevant hashtags at the end for Instagram (but keep them visually separated).
 - Keep it concise but engaging.
@@ -46,12 +152,78 @@ Rules:
 - For LinkedIn: more professional, no excessive hashtags, focus on value.
 - For Twitter/X: respect character limits (280 chars), 1-2 hashtags max.
 """
+
+SYSTEM_REPURPOSE = "Repurpose the user's social media caption for the target platform, following the guidelines given with it."
+
+PLATFORM_GUIDELINES = {
+    "instagram": "Use hashtags at the end, emojis throughout, casual/friendly tone, can be longer",
+    "linkedin": "Professional tone, fewer emojis, focus on value/insights, minimal hashtags",
+    "twitter": "Concise (under 280 chars ideally), conversational, 1-2 hashtags max",
+    "threads": "Conversational, can be part of a thread, engaging questions welcome",
+}
+
+SYSTEM_HASHTAGS = "Generate exactly the requested number of relevant hashtags for the given platform. Return only the hashtags, one per line, including the # symbol."
+
+# The classify_comment schema lists the allowed values, so the prompt only states the task
+SYSTEM_ANALYZE = "Classify the sentiment and category of the given social media comment by calling classify_comment."
+
+COMMENT_SENTIMENTS = ["positive", "neutral", "negative", "unknown"]
+COMMENT_CATEGORIES = ["question", "complaint", "spam", "praise", "general"]
+_VALID_SENTIMENTS = frozenset(COMMENT_SENTIMENTS)
+_VALID_CATEGORIES = frozenset(COMMENT_CATEGORIES)
+
+# Forcing this tool makes the model answer with schema-valid JSON arguments
+CLASSIFY_COMMENT_TOOL = {
+    "type": "function",
+    "function": {
+        "name": "classify_comment",
+        "description": "Record the sentiment and category of a social media comment.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "sentiment": {"type": "string", "enum": COMMENT_SENTIMENTS},
+                "category": {"type": "string", "enum": COMMENT_CATEGORIES},
+            },
+            "required": ["sentiment", "category"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+SYSTEM_REPLY = """You are a social media community manager for Instagram. Classify the user's comment and write a friendly, on-brand reply to it.
+
+Classification:
+- "sentiment": one of "positive", "neutral", "negative", or "unknown"
+- "category": one of "question", "complaint", "spam", "praise", or "general"
+
+Reply guidelines:
+- Be concise and friendly
+- Match the requested tone
+- Do not over-promise or make commitments you can't keep
+- Avoid sensitive topics or controversial statements
+- Keep it authentic and human-sounding
+- Use appropriate emojis sparingly
+- If the comment is a question, provide a helpful answer
+- If it's praise, thank them genuinely
+- If it's a complaint, acknowledge and offer help
+
+Return a JSON object with exactly the keys "sentiment", "category" and "reply".
+Example: {"sentiment": "positive", "category": "praise", "reply": "Thank you so much! 💛"}"""
+
+
+async def generate_caption(prompt: str, platform: str = "instagram", tone: str = "professional") -> str:
+    """
+    Generate a social media caption using OpenRouter.
+    """
+    try:
+        client = get_openrouter_client()
+        model = get_settings().openrouter_caption_model
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Generate a caption for: {prompt}"}
+                {"role": "system", "content": SYSTEM_CAPTION},
+                {"role": "user", "content": f"Platform: {platform}\nTone: {tone}\n\nGenerate a caption for: {prompt}"}
             ],
             max_tokens=500,
             temperature=0.7
@@ -69,20 +241,13 @@ async def repurpose_caption(original_caption: str, target_platform: str) -> str:
     """
     try:
         client = get_openrouter_client()
-        model = os.getenv("OPENROUTER_MODEL_CAPTION", "openai/gpt-4o-mini")
-        
-        platform_guidelines = {
-            "instagram": "Use hashtags at the end, emojis throughout, casual/friendly tone, can be longer",
-            "linkedin": "Professional tone, fewer emojis, focus on value/insights, minimal hashtags",
-            "twitter": "Concise (under 280 chars ideally), conversational, 1-2 hashtags max",
-            "threads": "Conversational, can be part of a thread, engaging questions welcome",
-        }
+        model = get_settings().openrouter_caption_model
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": f"Repurpose this social media caption for {target_platform}. Guidelines: {platform_guidelines.get(target_platform, 'Keep it engaging')}"},
-                {"role": "user", "content": original_caption}
+                {"role": "system", "content": SYSTEM_REPURPOSE},
+                {"role": "user", "content": f"Target platform: {target_platform}\nGuidelines: {PLATFORM_GUIDELINES.get(target_platform, 'Keep it engaging')}\n\nCaption:\n{original_caption}"}
             ],
             max_tokens=500,
             temperature=0.7
@@ -98,28 +263,94 @@ async def suggest_hashtags(content: str, platform: str = "instagram", count: int
     """
     Suggest relevant hashtags using OpenRouter.
     """
+    model = get_settings().openrouter_caption_model
+    cache_key = _cache_key(model, PROMPT_VERSION, platform, count, content)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return list(cached)
+    
     try:
         client = get_openrouter_client()
-        model = os.getenv("OPENROUTER_MODEL_CAPTION", "openai/gpt-4o-mini")
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": f"Generate exactly {count} relevant hashtags for {platform}. Return only the hashtags, one per line, including the # symbol."},
-                {"role": "user", "content": content}
+                {"role": "system", "content": SYSTEM_HASHTAGS},
+                {"role": "user", "content": f"Platform: {platform}\nNumber of hashtags: {count}\n\n{content}"}
             ],
-            max_tokens=200,
-            temperature=0.5
+            max_tokens=max(80, 8 * count),
+            temperature=0.2
         )
         
         hashtags = response.choices[0].message.content.strip().split('\n')
-        return [h.strip() for h in hashtags if h.startswith('#')]
+        hashtags = [h.strip() for h in hashtags if h.startswith('#')]
+        if hashtags:
+            _cache_put(cache_key, hashtags)
+        return list(hashtags)
         
     except Exception as e:
         logger.error(f"OpenRouter error in suggest_hashtags: {e}")
         raise e
 
 
+async def build_post_package(prompt: str, platforms: List[str], tone: str = "professional", hashtag_count: int = 10) -> Dict[str, Dict[str, Any]]:
+    """
+    Generate a caption and hashtags for every platform at once.
+    All OpenRouter calls run concurrently, so the package takes about as long as the
+    slowest single call instead of the sum of them.
+    
+    Returns:
+        {platform: {"caption": str, "hashtags": list}}
+    """
+    captions, hashtags = await asyncio.gather(
+        asyncio.gather(*(generate_caption(prompt, platform, tone) for platform in platforms)),
+        asyncio.gather(*(suggest_hashtags(prompt, platform, hashtag_count) for platform in platforms)),
+    )
+    return {
+        platform: {"caption": caption, "hashtags": tags}
+        for platform, caption, tags in zip(platforms, captions, hashtags)
+    }
+
+
+def _validate_analysis(result: Dict[str, Any]) -> Dict[str, str]:
+    """Keep only known sentiment/category values from a model's JSON answer."""
+    sentiment = result.get("sentiment", "unknown")
+    category = result.get("category", "general")
+    
+    if sentiment not in _VALID_SENTIMENTS:
+        sentiment = "unknown"
+    if category not in _VALID_CATEGORIES:
+        category = "general"
+    
+    return {"sentiment": sentiment, "category": category}
+
+
+def _classify_locally(text: str) -> Optional[Dict[str, str]]:
+    """Classify trivial comments (empty, emoji-only, very short) without an LLM call."""
+    if not text:
+        return {"sentiment": "unknown", "category": "general"}
+    if NON_TEXT_COMMENT.match(text):
+        return {"sentiment": "neutral", "category": "praise"}
+    if len(text) < 3:
+        return {"sentiment": "neutral", "category": "general"}
+    return None
+
+
+def _analysis_request(text: str, deployment: str) -> Dict[str, Any]:
+    """Chat completion parameters for classifying one comment (online and batch)."""
+    return {
+        "model": deployment,
+        "messages": [
+            {"role": "system", "content": SYSTEM_ANALYZE},
+            {"role": "user", "content": f"Analyze this comment: {text}"}
+        ],
+        "tools": [CLASSIFY_COMMENT_TOOL],
+        "tool_choice": {"type": "function", "function": {"name": "classify_comment"}},
+        "max_tokens": 40,
+        "temperature": 0,
+    }
+
+
 async def analyze_comment(text: str) -> Dict[str, str]:
     """
     Analyze a comment to determine sentiment and category using Azure OpenAI.
@@ -130,65 +361,33 @@ async def analyze_comment(text: str) -> Dict[str, str]:
     Returns:
         Dictionary with 'sentiment' and 'category' keys
     """
+    text = text.strip()
+    
+    # Trivial comments are classified locally
+    local = _classify_locally(text)
+    if local is not None:
+        return local
+    
+    deployment = get_settings().azure_openai_deployment
+    cache_key = _cache_key(deployment, PROMPT_VERSION, text)
+    cached = _cache_get(cache_key)
+    if cached is not None:
+        return dict(cached)
+    
     try:
         client = get_azure_client()
-        deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "MMNext-gpt-4o")
-        
-        system_prompt = """You are a social media comment analyzer. Analyze the given comment and classify it.
-
-Return a JSON object with exactly these two keys:
-- "sentiment": one of "positive", "neutral", "negative", or "unknown"
-- "category": one of "question", "complaint", "spam", "praise", or "general"
-
-Return ONLY valid JSON, no markdown code blocks, no explanation, just the JSON object.
-Example: {"sentiment": "positive", "category": "praise"}
-"""
-        
-        response = client.chat.completions.create(
-            model=deployment,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Analyze this comment: {text}"}
-            ],
-            max_tokens=100,
-            temperature=0.3
-        )
         
-        content = response.choices[0].message.content.strip()
+        response = await client.chat.completions.create(**_analysis_request(text, deployment))
         
-        # Remove markdown code fences if present
-        if content.startswith("```json"):
-            content = content[7:]
-        elif content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+        message = response.choices[0].message
+        content = message.tool_calls[0].function.arguments if message.tool_calls else (message.content or "")
         
         try:
-            # Try to extract JSON from the content
-            # Look for JSON object pattern
-            json_match = re.search(r'\{[^}]+\}', content)
-            if json_match:
-                content = json_match.group(0)
-            
-            result = json.loads(content)
+            analysis = _validate_analysis(orjson.loads(content))
+            _cache_put(cache_key, analysis)
             
-            # Validate keys
-            sentiment = result.get("sentiment", "unknown")
-            category = result.get("category", "general")
-            
-            # Validate values
-            if sentiment not in ["positive", "neutral", "negative", "unknown"]:
-                sentiment = "unknown"
-            if category not in ["question", "complaint", "spam", "praise", "general"]:
-                category = "general"
-            
-            return {
-                "sentiment": sentiment,
-                "category": category
-            }
-        except json.JSONDecodeError:
+            return dict(analysis)
+        except orjson.JSONDecodeError:
             logger.warning(f"Failed to parse AI analysis result as JSON: {content}")
             return {"sentiment": "unknown", "category": "general"}
         except Exception as e:
@@ -200,54 +399,155 @@ Example: {"sentiment": "positive", "category": "praise"}
         return {"sentiment": "unknown", "category": "general"}
 
 
-async def generate_comment_reply(comment_text: str, post_caption: Optional[str] = None, tone: str = "friendly") -> str:
+async def analyze_comments_bulk(texts: List[str], concurrency: int = 8) -> List[Dict[str, str]]:
+    """
+    Analyze many comments concurrently, at most `concurrency` requests in flight.
+    
+    Args:
+        texts: Comment texts to analyze
+        concurrency: Maximum simultaneous Azure OpenAI calls
+    
+    Returns:
+        One analysis dict per text, in the same order
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def analyze(text: str) -> Dict[str, str]:
+        async with semaphore:
+            return await analyze_comment(text)
+    
+    return await asyncio.gather(*(analyze(t) for t in texts))
+
+
+async def analyze_comments_batch(texts: Dict[str, str], poll_interval: float = 60.0) -> Dict[str, Dict[str, str]]:
     """
-    Generate an AI-powered reply suggestion for a comment.
+    Classify a backlog of comments through the Azure OpenAI Batch API.
+    
+    Batch jobs cost about half as much as online calls and are not subject to the
+    online rate limits, but may take up to 24 hours. Use analyze_comment for anything
+    a user is waiting on.
+    
+    Args:
+        texts: Comment texts keyed by an ID of the caller's choosing
+        poll_interval: Seconds between batch status checks
+    
+    Returns:
+        Analysis dict per ID; comments the batch could not classify get "unknown"/"general"
+    
+    Raises:
+        Exception: If the batch job fails, expires or is cancelled
+    """
+    deployment = get_settings().azure_openai_deployment
+    results: Dict[str, Dict[str, str]] = {}
+    lines = []
+    
+    for custom_id, text in texts.items():
+        text = text.strip()
+        local = _classify_locally(text)
+        if local is not None:
+            results[str(custom_id)] = local
+            continue
+        lines.append(orjson.dumps({
+            "custom_id": str(custom_id),
+            "method": "POST",
+            "url": "/chat/completions",
+            "body": _analysis_request(text, deployment),
+        }))
+    
+    if not lines:
+        return results
+    
+    client = get_azure_client()
+    batch_file = await client.files.create(file=("comments.jsonl", b"\n".join(lines)), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/chat/completions",
+        completion_window="24h"
+    )
+    logger.info(f"Submitted comment analysis batch {batch.id} ({len(lines)} comments)")
+    
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(poll_interval)
+        batch = await client.batches.retrieve(batch.id)
+    
+    if batch.status != "completed" or not batch.output_file_id:
+        raise Exception(f"Comment analysis batch {batch.id} ended with status {batch.status}")
+    
+    output = await client.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        row = orjson.loads(line)
+        try:
+            message = row["response"]["body"]["choices"][0]["message"]
+            arguments = message["tool_calls"][0]["function"]["arguments"]
+            results[row["custom_id"]] = _validate_analysis(orjson.loads(arguments))
+        except (KeyError, IndexError, TypeError, ValueError):
+            logger.warning(f"Batch {batch.id}: no analysis for {row.get('custom_id')}: {row.get('error')}")
+    
+    for custom_id in texts:
+        results.setdefault(str(custom_id), {"sentiment": "unknown", "category": "general"})
+    logger.info(f"Comment analysis batch {batch.id} completed")
+    return results
+
+
+async def analyze_and_reply(comment_text: str, post_caption: Optional[str] = None, tone: str = "friendly") -> Dict[str, str]:
+    """
+    Classify a comment and draft a reply to it in a single Azure OpenAI call.
     
     Args:
-        comment_text: The comment text to reply to
+        comment_text: The comment text to analyze and reply to
         post_caption: Optional post caption for context
         tone: Tone for the reply (default: "friendly")
     
     Returns:
-        Suggested reply text
+        Dictionary with 'sentiment', 'category' and 'reply' keys
     """
+    deployment = get_settings().azure_openai_deployment
+    bucket_key = _cache_key(deployment, PROMPT_VERSION, tone, post_caption or "")
+    normalized = _normalize_comment(comment_text)
+    vector = None
+    
+    if not CACHE_DISABLED:
+        cached = _find_cached_reply(bucket_key, normalized)
+        if cached is None:
+            vector = await _embed_comment(comment_text)
+            if vector is not None:
+                cached = _find_cached_reply(bucket_key, normalized, vector)
+        if cached is not None:
+            return dict(cached)
+    
     try:
         client = get_azure_client()
-        deployment = os.getenv("AZURE_OPENAI_DEPLOYMENT_NAME", "MMNext-gpt-4o")
         
         context = f"Original post caption: {post_caption}" if post_caption else "No post context available"
         
-        system_prompt = f"""You are a social media community manager for Instagram. Generate a friendly, on-brand reply to user comments.
-
-Guidelines:
-- Be concise and friendly
-- Match the {tone} tone
-- Do not over-promise or make commitments you can't keep
-- Avoid sensitive topics or controversial statements
-- Keep it authentic and human-sounding
-- Use appropriate emojis sparingly
-- If the comment is a question, provide a helpful answer
-- If it's praise, thank them genuinely
-- If it's a complaint, acknowledge and offer help
-
-Return only the reply text, no explanations or additional formatting."""
-        
-        user_message = f"Comment to reply to: {comment_text}\n\n{context}\n\nGenerate a {tone} reply:"
+        user_message = f"Tone: {tone}\n{context}\n\nComment to reply to: {comment_text}\n\nClassify it and generate a {tone} reply:"
         
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=deployment,
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_REPLY},
                 {"role": "user", "content": user_message}
             ],
-            max_tokens=200,
-            temperature=0.7
+            response_format={"type": "json_object"},
+            max_tokens=150,
+            temperature=0.4
         )
         
-        return response.choices[0].message.content.strip()
+        result = orjson.loads(response.choices[0].message.content)
+        reply = str(result.get("reply") or "").strip()
+        if not reply:
+            raise ValueError("AI response did not contain a reply")
+        
+        analysis = _validate_analysis(result)
+        combined = {**analysis, "reply": reply}
+        if not CACHE_DISABLED:
+            _cache_put(_cache_key(deployment, PROMPT_VERSION, comment_text.strip()), analysis)
+            _store_reply(bucket_key, normalized, vector, combined)
+        return combined
         
     except Exception as e:
-        logger.error(f"Comment reply generation error: {e}")
+        logger.error(f"Comment analysis and reply error: {e}")
         raise e
 
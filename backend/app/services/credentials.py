@@ -0,0 +1,99 @@
+"""
+Instagram Credentials
+One process-wide resolver (.env > database channel) shared by publishing and the comment endpoints
+"""
+
+import logging
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from ..config import get_settings
+from ..models import models
+
+logger = logging.getLogger(__name__)
+
+# Seconds credentials read from the database channel are reused before re-reading
+CREDENTIALS_CACHE_TTL_SECONDS = 300
+
+# .env credentials already written to the database channel by this process
+_synced_env_credentials: Optional[Tuple[str, str]] = None
+
+# (user_id, token) read from the database channel, with the monotonic time it expires
+_db_credentials: Optional[Tuple[Tuple[str, str], float]] = None
+
+
+class CredentialsError(Exception):
+    """No usable Instagram credentials are configured."""
+
+
+def invalidate_credentials() -> None:
+    """Forget cached Instagram credentials; call after the stored channel credentials change."""
+    global _synced_env_credentials, _db_credentials
+
+    _synced_env_credentials = None
+    _db_credentials = None
+
+
+def resolve_credentials(db: Session) -> Tuple[str, str]:
+    """
+    Resolve Instagram credentials (.env > DB) without a channel lookup per call.
+
+    .env credentials are process-constant, so the channel is only read (and synced,
+    when it differs) the first time they are used. Database credentials are reused
+    for CREDENTIALS_CACHE_TTL_SECONDS.
+
+    Args:
+        db: Session used for the channel lookup and any sync
+
+    Returns:
+        Tuple[str, str]: (user_id, token)
+
+    Raises:
+        CredentialsError: If no usable credentials are configured
+    """
+    global _synced_env_credentials, _db_credentials
+
+    settings = get_settings()
+
+    if settings.instagram_user_id and settings.instagram_access_token:
+        # Use .env credentials
+        env_pair = (settings.instagram_user_id, settings.instagram_access_token)
+
+        if _synced_env_credentials != env_pair:
+            # Sync to DB for consistency, skipping the write when the stored credentials match
+            env_credentials = {"user_id": env_pair[0], "access_token": env_pair[1]}
+            channel = db.query(models.Channel).filter(models.Channel.platform == "instagram").first()
+            if channel:
+                if channel.credentials != env_credentials:
+                    channel.credentials = env_credentials
+                    db.commit()
+                    logger.info("[CREDENTIALS] Updated database channel with .env credentials")
+            else:
+                db.add(models.Channel(
+                    platform="instagram",
+                    name="Default Account",
+                    credentials=env_credentials
+                ))
+                db.commit()
+                logger.info("[CREDENTIALS] Created new channel with .env credentials")
+            _synced_env_credentials = env_pair
+        return env_pair
+
+    if _db_credentials is not None and _db_credentials[1] > time.monotonic():
+        return _db_credentials[0]
+
+    # Fall back to database
+    channel = db.query(models.Channel).filter(models.Channel.platform == "instagram").first()
+    if not (channel and channel.credentials):
+        raise CredentialsError("No Instagram credentials found. Please set INSTAGRAM_USER_ID and INSTAGRAM_ACCESS_TOKEN in backend/.env file.")
+
+    user_id = channel.credentials.get("user_id")
+    token = channel.credentials.get("access_token")
+    if not user_id or not token:
+        raise CredentialsError("Invalid channel credentials (user_id or token missing)")
+
+    logger.debug("[CREDENTIALS] Using credentials from database channel")
+    _db_credentials = ((user_id, token), time.monotonic() + CREDENTIALS_CACHE_TTL_SECONDS)
+    return user_id, token
@@ -0,0 +1,68 @@
+"""
+Shared HTTP Clients
+Process-wide connection pools for outbound API calls (OpenRouter, Azure OpenAI, Instagram Graph API, Freeimage.host)
+"""
+
+import httpx
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Connection pool limits shared by every outbound API call
+HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+# Default timeout; individual calls pass their own where they need longer
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=10.0)
+
+# Negotiate HTTP/2 where the API offers it (OpenRouter, Graph API); concurrent calls
+# to one host then share a single multiplexed connection. Falls back to HTTP/1.1.
+HTTP2 = True
+
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the shared HTTP client.
+    Reusing one client keeps TCP/TLS connections alive between calls instead of
+    paying a new handshake per request. httpx.Client is safe to share across threads.
+    """
+    global _http_client
+
+    if _http_client is None:
+        _http_client = httpx.Client(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=HTTP2)
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """
+    Return the shared async HTTP client, for calls made from async endpoints.
+    Awaiting it keeps the event loop free while the API responds, so concurrent
+    calls overlap instead of queueing behind each other.
+    """
+    global _async_http_client
+
+    if _async_http_client is None:
+        _async_http_client = httpx.AsyncClient(limits=HTTP_LIMITS, timeout=HTTP_TIMEOUT, http2=HTTP2)
+    return _async_http_client
+
+
+async def close_http_clients() -> None:
+    """Close the shared HTTP clients (called on application shutdown)."""
+    global _http_client, _async_http_client
+    from .ai_assistant import get_azure_client, get_openrouter_client
+
+    # The cached AI SDK clients wrap the async client closed below; drop them so a
+    # restarted app (tests, --reload) builds new ones on the new transport
+    get_azure_client.cache_clear()
+    get_openrouter_client.cache_clear()
+
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+    logger.info("[HTTP] Shared HTTP clients closed")
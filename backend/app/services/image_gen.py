@@ -1,24 +1,59 @@
 import os
 import uuid
+import asyncio
 from datetime import datetime
-import requests
+import httpx
+import orjson
 import base64
 from io import BytesIO
 from PIL import Image
 from fastapi import HTTPException
 import logging
+from ..config import get_settings
+from .http_clients import get_async_http_client
 
 logger = logging.getLogger(__name__)
 
+OUTPUT_DIR = "generated_images"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+OPENROUTER_API_URL = "https://openrouter.ai/api/v1/chat/completions"
+
+# Most images one generate request may ask for
+MAX_IMAGES_PER_REQUEST = 8
+
+# Most image requests in flight to OpenRouter per generate call
+IMAGE_GEN_CONCURRENCY = 4
+
+
+def _encode_and_save(img_data: bytes, file_path: str) -> None:
+    """Decode a generated image and save it as JPEG (CPU-bound; run it in a worker thread)."""
+    image = Image.open(BytesIO(img_data))
+    # JPEG sources: let libjpeg decode straight to RGB
+    image.draft("RGB", image.size)
+    
+    # Convert to RGB if necessary (for JPEG compatibility)
+    if image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info):
+        # Create white background for transparent images
+        image = image.convert("RGBA")
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel("A"))
+        image = background
+    elif image.mode != "RGB":
+        image = image.convert("RGB")
+    
+    # Single-pass encode; 88 with 4:2:0 chroma is visually indistinguishable from 95 for feed images
+    image.save(file_path, "JPEG", quality=88, subsampling=2, optimize=False, progressive=False)
+
+
 async def generate_images_service(prompt: str, count: int = 1, model: str = "google/gemini-2.5-flash-image"):
     """
     Generates images using OpenRouter API with Gemini 2.5 Flash Image model.
     """
     generated_paths = []
-    output_dir = "generated_images"
-    os.makedirs(output_dir, exist_ok=True)
+    settings = get_settings()
     
-    api_key = os.getenv("OPENROUTER_API_KEY")
+    api_key = settings.openrouter_api_key
     if not api_key:
         logger.warning("OPENROUTER_API_KEY not found. Falling back to mock generation for testing.")
         # Fallback to mock if no key (so app doesn't crash during dev without keys)
@@ -33,23 +68,26 @@ async def generate_images_service(prompt: str, count: int = 1, model: str = "goo
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             unique_id = uuid.uuid4().hex[:8]
             filename = f"mock_{timestamp}_{unique_id}_{i}.jpg"
-            path = os.path.join(output_dir, filename)
-            img.save(path)
+            path = os.path.join(OUTPUT_DIR, filename)
+            await asyncio.to_thread(img.save, path)
             generated_paths.append(f"generated_images/{filename}")
         return generated_paths
 
-    # Sanitize API key
-    api_key = api_key.strip().strip('"').strip("'")
-    
-    api_url = "https://openrouter.ai/api/v1/chat/completions"
     headers = {
         "Authorization": f"Bearer {api_key}",
         "Content-Type": "application/json",
-        "HTTP-Referer": os.getenv("OPENROUTER_SITE_URL", "http://localhost:3000"),
+        "HTTP-Referer": settings.openrouter_site_url,
         "X-Title": "VelvetQueue"
     }
 
-    for i in range(count):
+    client = get_async_http_client()
+    semaphore = asyncio.Semaphore(IMAGE_GEN_CONCURRENCY)
+
+    async def _one(i: int) -> str:
+        async with semaphore:
+            return await _generate_one(i)
+
+    async def _generate_one(i: int) -> str:
         try:
             # Prepare payload with image_config for Gemini model
             payload = {
@@ -67,9 +105,9 @@ async def generate_images_service(prompt: str, count: int = 1, model: str = "goo
             }
             
             logger.info(f"Generating image {i+1}/{count} with prompt: {prompt[:50]}...")
-            response = requests.post(api_url, json=payload, headers=headers, timeout=120)
+            response = await client.post(OPENROUTER_API_URL, content=orjson.dumps(payload), headers=headers, timeout=120)
             response.raise_for_status()
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Extract image from response structure
             # Gemini 2.5 Flash Image returns: data['choices'][0]['message']['images'][0]['image_url']['url']
@@ -96,12 +134,12 @@ async def generate_images_service(prompt: str, count: int = 1, model: str = "goo
 
             # Download and decode image
             if image_data_url.startswith("data:image/"):
-                # Base64 encoded image
-                base64_data = image_data_url.split(",")[1]
-                img_data = base64.b64decode(base64_data)
+                # Base64 encoded image; decode straight from the URL's payload
+                img_data = base64.b64decode(image_data_url.partition(",")[2])
+                del image_data_url, data
             else:
                 # URL - download the image
-                img_resp = requests.get(image_data_url, timeout=60)
+                img_resp = await client.get(image_data_url, timeout=60)
                 img_resp.raise_for_status()
                 img_data = img_resp.content
 
@@ -109,30 +147,19 @@ async def generate_images_service(prompt: str, count: int = 1, model: str = "goo
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             unique_id = uuid.uuid4().hex[:8]
             filename = f"gen_{timestamp}_{unique_id}_{i}.jpg"
-            file_path = os.path.join(output_dir, filename)
+            file_path = os.path.join(OUTPUT_DIR, filename)
 
-            # Process and save image
-            image = Image.open(BytesIO(img_data))
-            
-            # Convert to RGB if necessary (for JPEG compatibility)
-            if image.mode not in ("RGB", "RGBA"):
-                image = image.convert("RGB")
-            elif image.mode == "RGBA":
-                # Create white background for transparent images
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                background.paste(image, mask=image.split()[-1] if image.mode == "RGBA" else None)
-                image = background
-            
-            image.save(file_path, "JPEG", quality=95)
+            # Process and save image off the event loop so other requests keep being served
+            await asyncio.to_thread(_encode_and_save, img_data, file_path)
             logger.info(f"Image saved successfully: {file_path}")
             
-            generated_paths.append(f"generated_images/{filename}")
+            return f"generated_images/{filename}"
 
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             error_data = {}
             try:
                 if e.response.text:
-                    error_data = e.response.json()
+                    error_data = orjson.loads(e.response.content)
             except Exception:
                 error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response body"}
             
@@ -149,7 +176,7 @@ async def generate_images_service(prompt: str, count: int = 1, model: str = "goo
                 status_code=e.response.status_code,
                 detail=f"Image generation API error: {error_message}"
             )
-        except requests.exceptions.RequestException as e:
+        except httpx.RequestError as e:
             logger.error(f"Network error during image generation: {str(e)}")
             raise HTTPException(
                 status_code=503,
@@ -164,6 +191,16 @@ async def generate_images_service(prompt: str, count: int = 1, model: str = "goo
                 detail=f"Unexpected error during image generation: {str(e)}"
             )
             
+    # Run requests concurrently (bounded by IMAGE_GEN_CONCURRENCY); latency is roughly the slowest batch rather than the sum
+    results = await asyncio.gather(*[_one(i) for i in range(count)], return_exceptions=True)
+    errors = [r for r in results if isinstance(r, BaseException)]
+    generated_paths = [r for r in results if not isinstance(r, BaseException)]
+
+    if errors and generated_paths:
+        logger.warning(f"Generated {len(generated_paths)}/{count} images; {len(errors)} failed: {errors[0]}")
+    elif errors:
+        raise errors[0]
+
     if not generated_paths:
         raise HTTPException(
             status_code=500,
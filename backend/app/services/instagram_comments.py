@@ -3,22 +3,277 @@ Instagram Comments Service
 Handles fetching comments, replying, and managing comment interactions via Instagram Graph API
 """
 
-import requests
+import asyncio
+import random
+import re
+import httpx
+import orjson
 import os
+import time
 import logging
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from urllib.parse import urlencode
+from typing import AsyncIterator, Optional, Dict, Any, List, Tuple, Union
+from .http_clients import get_async_http_client
 
 logger = logging.getLogger(__name__)
 
-def get_post_comments(media_id: str, access_token: str, limit: int = 50, after: Optional[str] = None) -> Dict[str, Any]:
+INSTAGRAM_API_VERSION = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
+GRAPH_BASE = f"https://graph.facebook.com/{INSTAGRAM_API_VERSION}"
+
+# Only the fields callers store; a smaller payload per page
+COMMENT_FIELDS = "id,text,username,parent_id"
+
+# Graph error messages that mean the access token must be replaced
+# ("Session has expired", "... token has expired")
+EXPIRED_TOKEN_MESSAGE = re.compile(r"expired", re.IGNORECASE)
+
+# Features the Graph API does not offer: pinning comments and hiding like counts are
+# only available in the Instagram app
+PIN_COMMENT_SUPPORTED = False
+HIDE_LIKE_COUNT_SUPPORTED = False
+
+# Tokens the Graph API has rejected as expired are refused locally for this long, so a
+# bulk operation fails at once instead of making the same doomed call for every item
+EXPIRED_TOKEN_CACHE_SECONDS = 300
+_expired_tokens: "Dict[str, Tuple[float, InstagramTokenExpiredError]]" = {}
+
+# Transient Graph API responses worth retrying, and how hard to try
+GRAPH_RETRY_STATUSES = {429, 500, 502, 503, 504}
+GRAPH_MAX_ATTEMPTS = 5
+GRAPH_BACKOFF_BASE_SECONDS = 1.0
+GRAPH_BACKOFF_MAX_SECONDS = 30.0
+
+# Most Graph API requests a bulk operation keeps in flight (stays under per-user rate limits)
+GRAPH_CONCURRENCY = 10
+
+# Graph API limit on operations per batch request
+GRAPH_BATCH_SIZE = 50
+
+# Comment pages are reused for this many seconds (0 disables); for up to twice as long a
+# stale page is still served while a fresh copy loads in the background
+COMMENTS_CACHE_TTL_SECONDS = int(os.getenv("INSTAGRAM_COMMENTS_CACHE_TTL", "60"))
+COMMENTS_CACHE_SIZE = 1024
+_comments_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_comments_refreshes: Dict[tuple, asyncio.Task] = {}
+
+
+class InstagramAPIError(Exception):
+    """Error response from the Instagram Graph API."""
+    
+    def __init__(
+        self,
+        message: str,
+        code: Optional[int] = None,
+        status_code: Optional[int] = None,
+        error_type: Optional[str] = None
+    ):
+        super().__init__(message)
+        self.message = message
+        self.code = code
+        self.status_code = status_code
+        self.error_type = error_type
+    
+    def __str__(self) -> str:
+        return f"Instagram API error: {self.message} (Code: {self.code}, Type: {self.error_type})"
+
+
+class InstagramTokenExpiredError(InstagramAPIError):
+    """The Instagram access token is invalid or has expired (Graph API error code 190)."""
+    
+    def __str__(self) -> str:
+        return f"Instagram access token has expired. {self.message}. Please update your INSTAGRAM_ACCESS_TOKEN in the .env file or channel settings."
+
+
+def parse_graph_error(response: httpx.Response) -> InstagramAPIError:
+    """Build the InstagramAPIError (or InstagramTokenExpiredError) for a failed Graph API response."""
+    return _graph_error_from_body(response.status_code, response.content)
+
+
+def _graph_error_from_body(status_code: int, body: Union[bytes, str, None]) -> InstagramAPIError:
+    """Build the InstagramAPIError (or InstagramTokenExpiredError) for an error status and its response body."""
+    error_message = f"HTTP {status_code}"
+    error_code = None
+    error_type = None
+    
+    try:
+        error_data = orjson.loads(body or b"")
+        error_obj = error_data.get("error") if isinstance(error_data, dict) else None
+        if isinstance(error_obj, dict):
+            error_message = error_obj.get("message", error_message)
+            error_code = error_obj.get("code")
+            error_type = error_obj.get("type")
+    except ValueError:
+        error_data = {"raw_response": body[:500] if body else "No response"}
+    
+    logger.error("[INSTAGRAM] ✗ Graph API error (status %s): %s", status_code, error_data)
+    
+    if error_code == 190 or EXPIRED_TOKEN_MESSAGE.search(error_message):
+        return InstagramTokenExpiredError(error_message, error_code, status_code, error_type)
+    return InstagramAPIError(error_message, error_code, status_code, error_type)
+
+
+async def graph_request(method: str, url: str, timeout: float = 30, idempotent: Optional[bool] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Call the Graph API and return the decoded JSON body.
+    
+    Rate limits (429) are retried with exponential backoff and jitter, up to
+    GRAPH_MAX_ATTEMPTS attempts in total. 5xx responses and mid-flight network errors
+    are retried only for idempotent calls, since Graph may already have applied a
+    write before failing. A Retry-After header sets the wait instead, up to
+    GRAPH_BACKOFF_MAX_SECONDS; a longer one fails straight away. Other errors
+    (e.g. 400, 403, an expired token) are raised straight away.
+    
+    Args:
+        method: HTTP method
+        url: Graph API URL
+        timeout: Per-attempt timeout in seconds
+        idempotent: Whether resending the call is safe; defaults to True for GET only
+    
+    Raises:
+        InstagramAPIError: If the API returns an error response
+        httpx.TransportError: If the API stays unreachable
+    """
+    access_token = _request_token(kwargs)
+    expired = _expired_tokens.get(access_token)
+    if expired is not None:
+        expires, error = expired
+        if expires > time.monotonic():
+            raise InstagramTokenExpiredError(error.message, error.code, error.status_code, error.error_type)
+        del _expired_tokens[access_token]
+    
+    client = get_async_http_client()
+    started = time.monotonic()
+    if "json" in kwargs:
+        kwargs["content"] = orjson.dumps(kwargs.pop("json"))
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Content-Type": "application/json"}
+    
+    if idempotent is None:
+        idempotent = method == "GET"
+    
+    for attempt in range(1, GRAPH_MAX_ATTEMPTS + 1):
+        try:
+            response = await client.request(method, url, timeout=timeout, **kwargs)
+        except httpx.TransportError as e:
+            # A write that failed mid-flight may already have been applied; only resend
+            # it when the request never reached the server
+            retryable = idempotent or isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+            if not retryable or attempt == GRAPH_MAX_ATTEMPTS:
+                raise
+            reason = str(e) or type(e).__name__
+            retry_after = None
+        else:
+            # A 429 was refused before anything ran; a 5xx may follow an applied write
+            retryable = response.status_code == 429 or (idempotent and response.status_code in GRAPH_RETRY_STATUSES)
+            if not retryable or attempt == GRAPH_MAX_ATTEMPTS:
+                break
+            reason = f"HTTP {response.status_code}"
+            retry_after = response.headers.get("Retry-After")
+        
+        if retry_after and retry_after.isdigit():
+            delay = float(retry_after)
+            if delay > GRAPH_BACKOFF_MAX_SECONDS:
+                # Don't park a publish or request for longer than the cap; fail now instead
+                logger.warning("[INSTAGRAM] %s from Graph API with Retry-After %ss, not retrying", reason, retry_after)
+                break
+        else:
+            delay = min(GRAPH_BACKOFF_MAX_SECONDS, GRAPH_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+            delay = random.uniform(0, delay)
+        logger.warning("[INSTAGRAM] %s from Graph API, retrying in %.1fs (attempt %d/%d)", reason, delay, attempt, GRAPH_MAX_ATTEMPTS)
+        await asyncio.sleep(delay)
+    
+    # One structured record per call; URLs never carry the token (it goes in params/body)
+    logger.debug(
+        "[INSTAGRAM] Graph %s %s -> %s", method, url, response.status_code,
+        extra={
+            "graph_method": method,
+            "graph_url": url,
+            "status_code": response.status_code,
+            "attempts": attempt,
+            "elapsed_ms": round((time.monotonic() - started) * 1000),
+        }
+    )
+    
+    if response.is_error:
+        error = parse_graph_error(response)
+        if isinstance(error, InstagramTokenExpiredError) and access_token:
+            _expired_tokens[access_token] = (time.monotonic() + EXPIRED_TOKEN_CACHE_SECONDS, error)
+        raise error
+    return orjson.loads(response.content)
+
+
+def _request_token(kwargs: Dict[str, Any]) -> Optional[str]:
+    """Find the access token in a Graph request's query, JSON body or form body."""
+    for part in ("params", "json", "data"):
+        body = kwargs.get(part)
+        if isinstance(body, dict) and body.get("access_token"):
+            return body["access_token"]
+    return None
+
+async def batch_execute(ops: List[Dict[str, Any]], access_token: str) -> List[Union[Dict[str, Any], Exception]]:
+    """
+    Run several Graph API operations through the batch endpoint.
+    
+    Operations are sent GRAPH_BATCH_SIZE at a time, so N calls cost N/50 round trips
+    instead of N; the chunks themselves go out concurrently.
+    
+    Args:
+        ops: Batch operations, e.g. {"method": "POST", "relative_url": "123/replies", "body": "message=hi"}
+        access_token: Instagram access token (applies to every operation)
+    
+    Returns:
+        One entry per operation, in order: the decoded response body, or the
+        InstagramAPIError that operation failed with
+    
+    Raises:
+        InstagramAPIError: If the batch request itself is rejected
+    """
+    semaphore = asyncio.Semaphore(GRAPH_CONCURRENCY)
+    
+    async def run_chunk(chunk: List[Dict[str, Any]]) -> List[Union[Dict[str, Any], Exception]]:
+        async with semaphore:
+            responses = await graph_request(
+                "POST",
+                GRAPH_BASE,
+                data={"access_token": access_token, "batch": orjson.dumps(chunk).decode()}
+            )
+        
+        results = []
+        for op_response in responses:
+            # Operations Facebook could not finish in time come back as null
+            if op_response is None:
+                results.append(InstagramAPIError("Batch operation timed out"))
+            elif op_response.get("code", 200) >= 400:
+                results.append(_graph_error_from_body(op_response["code"], op_response.get("body")))
+            else:
+                results.append(orjson.loads(op_response.get("body") or b"{}"))
+        return results
+    
+    chunks = [ops[i:i + GRAPH_BATCH_SIZE] for i in range(0, len(ops), GRAPH_BATCH_SIZE)]
+    chunk_results = await asyncio.gather(*[run_chunk(chunk) for chunk in chunks])
+    return [result for chunk in chunk_results for result in chunk]
+
+
+async def get_post_comments(
+    media_id: str,
+    access_token: str,
+    limit: int = 100,
+    after: Optional[str] = None,
+    use_cache: bool = True
+) -> Dict[str, Any]:
     """
     Fetch comments from an Instagram post via Graph API.
     
+    Pages fetched within the last COMMENTS_CACHE_TTL_SECONDS are served from memory.
+    A page up to twice that old is served as-is while it refreshes in the background.
+    Pages are cached per access token, so a reconnected account never sees another's.
+    
     Args:
         media_id: Instagram media ID (from post.platform_settings["instagram_media_id"])
         access_token: Instagram access token
-        limit: Maximum number of comments to fetch (default 50)
+        limit: Maximum number of comments to fetch (default 100, the Graph API maximum)
         after: Cursor for pagination (optional)
+        use_cache: False to always fetch from the API (the fresh page still refills the cache)
     
     Returns:
         Dictionary with 'data' (list of comments) and 'paging' (pagination info)
@@ -26,15 +281,69 @@ def get_post_comments(media_id: str, access_token: str, limit: int = 50, after:
     Raises:
         Exception: If API call fails
     """
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{media_id}/comments"
+    if COMMENTS_CACHE_TTL_SECONDS <= 0:
+        return await _fetch_post_comments(media_id, access_token, limit, after)
+    
+    key = (media_id, limit, after, access_token)
+    entry = _comments_cache.get(key) if use_cache else None
+    age = time.monotonic() - entry[0] if entry else None
+    
+    if entry is None or age >= 2 * COMMENTS_CACHE_TTL_SECONDS:
+        result = await _fetch_post_comments(media_id, access_token, limit, after)
+        _store_comments(key, result)
+    else:
+        result = entry[1]
+        _comments_cache.move_to_end(key)
+        if age >= COMMENTS_CACHE_TTL_SECONDS and key not in _comments_refreshes:
+            _comments_refreshes[key] = asyncio.create_task(_refresh_comments(key))
+    
+    # Callers may modify the page; keep the cached copy intact
+    return {"data": list(result["data"]), "paging": dict(result["paging"])}
+
+
+def _store_comments(key: tuple, result: Dict[str, Any]) -> None:
+    """Cache a comment page, evicting the least recently used beyond COMMENTS_CACHE_SIZE."""
+    _comments_cache[key] = (time.monotonic(), result)
+    _comments_cache.move_to_end(key)
+    while len(_comments_cache) > COMMENTS_CACHE_SIZE:
+        _comments_cache.popitem(last=False)
+
+
+async def _refresh_comments(key: tuple) -> None:
+    """Re-fetch a stale comment page in the background."""
+    media_id, limit, after, access_token = key
+    try:
+        _store_comments(key, await _fetch_post_comments(media_id, access_token, limit, after))
+    except Exception as e:
+        logger.warning("[INSTAGRAM COMMENTS] Background comment refresh failed: %s", e)
+    finally:
+        _comments_refreshes.pop(key, None)
+
+
+def invalidate_post_comments(media_id: Optional[str] = None) -> None:
+    """
+    Drop cached comment pages after we change a post's comments.
     
-    logger.info(f"[INSTAGRAM COMMENTS] Fetching comments for media ID: {media_id}")
-    logger.info(f"[INSTAGRAM COMMENTS] API URL: {url}")
+    Args:
+        media_id: Post whose pages to drop; None drops every post's (replies and hides
+            only know the comment ID, not the post it belongs to)
+    """
+    if media_id is None:
+        _comments_cache.clear()
+        return
+    for key in [key for key in _comments_cache if key[0] == media_id]:
+        del _comments_cache[key]
+
+
+async def _fetch_post_comments(media_id: str, access_token: str, limit: int, after: Optional[str]) -> Dict[str, Any]:
+    """Fetch one page of comments from the Graph API (uncached)."""
+    url = f"{GRAPH_BASE}/{media_id}/comments"
+    
+    logger.debug("[INSTAGRAM COMMENTS] Fetching comments for media ID: %s", media_id)
     
     params = {
         "access_token": access_token,
-        "fields": "id,text,username,timestamp,parent_id",
+        "fields": COMMENT_FIELDS,
         "limit": limit
     }
     
@@ -42,51 +351,76 @@ def get_post_comments(media_id: str, access_token: str, limit: int = 50, after:
         params["after"] = after
     
     try:
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        result = await graph_request("GET", url, params=params)
         
         data = result.get("data", [])
         paging = result.get("paging", {})
         
-        logger.info(f"[INSTAGRAM COMMENTS] ✓ Fetched {len(data)} comments")
+        logger.debug("[INSTAGRAM COMMENTS] ✓ Fetched %d comments", len(data))
         
         return {
             "data": data,
             "paging": paging
         }
         
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        error_code = None
-        
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-                        error_code = error_obj.get('code')
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ HTTP error fetching comments: {error_data}")
-        logger.error(f"[INSTAGRAM COMMENTS] Status code: {e.response.status_code}")
-        logger.error(f"[INSTAGRAM COMMENTS] Error message: {error_message}")
-        
-        if error_code == 190 or "expired" in error_message.lower() or "session has expired" in error_message.lower():
-            raise Exception(f"Instagram access token has expired. {error_message}. Please update your INSTAGRAM_ACCESS_TOKEN.")
-        else:
-            raise Exception(f"Instagram API error: {error_message} (Code: {error_code})")
-            
     except Exception as e:
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ Error fetching comments: {str(e)}")
+        logger.error("[INSTAGRAM COMMENTS] ✗ Error fetching comments: %s", e)
         raise
 
 
-def reply_to_comment(comment_id: str, message: str, access_token: str) -> str:
+async def iter_all_comments(
+    media_id: str,
+    access_token: str,
+    page_size: int = 100,
+    use_cache: bool = True
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield every comment on an Instagram post, following the paging cursors.
+    
+    The next page is fetched in the background while the caller works through the
+    current one, so page latency overlaps with processing instead of adding up.
+    
+    Args:
+        media_id: Instagram media ID
+        access_token: Instagram access token
+        page_size: Comments per Graph API request (max 100)
+        use_cache: False to read every page from the API (see get_post_comments)
+    
+    Raises:
+        Exception: If any page fails to load
+    """
+    pages: asyncio.Queue = asyncio.Queue(maxsize=2)
+    
+    async def fetch_pages():
+        after = None
+        try:
+            while True:
+                page = await get_post_comments(media_id, access_token, limit=page_size, after=after, use_cache=use_cache)
+                await pages.put(page["data"])
+                paging = page["paging"]
+                after = paging.get("cursors", {}).get("after") if paging.get("next") else None
+                if not after or not page["data"]:
+                    break
+        except Exception as e:
+            await pages.put(e)
+            return
+        await pages.put(None)
+    
+    fetcher = asyncio.create_task(fetch_pages())
+    try:
+        while True:
+            page = await pages.get()
+            if page is None:
+                return
+            if isinstance(page, Exception):
+                raise page
+            for comment in page:
+                yield comment
+    finally:
+        fetcher.cancel()
+
+
+async def reply_to_comment(comment_id: str, message: str, access_token: str) -> str:
     """
     Reply to an Instagram comment.
     
@@ -101,12 +435,10 @@ def reply_to_comment(comment_id: str, message: str, access_token: str) -> str:
     Raises:
         Exception: If API call fails
     """
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{comment_id}/replies"
+    url = f"{GRAPH_BASE}/{comment_id}/replies"
     
-    logger.info(f"[INSTAGRAM COMMENTS] Replying to comment ID: {comment_id}")
-    logger.info(f"[INSTAGRAM COMMENTS] Reply message: {message[:50]}...")
-    logger.info(f"[INSTAGRAM COMMENTS] API URL: {url}")
+    logger.debug("[INSTAGRAM COMMENTS] Replying to comment ID: %s", comment_id)
+    logger.debug("[INSTAGRAM COMMENTS] Reply message: %s...", message[:50])
     
     data = {
         "message": message,
@@ -114,52 +446,55 @@ def reply_to_comment(comment_id: str, message: str, access_token: str) -> str:
     }
     
     try:
-        response = requests.post(url, json=data, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        result = await graph_request("POST", url, json=data)
         
         reply_id = result.get("id")
         
         if not reply_id:
-            logger.error(f"[INSTAGRAM COMMENTS] ✗ No reply ID in response: {result}")
+            logger.error("[INSTAGRAM COMMENTS] ✗ No reply ID in response: %s", result)
             raise Exception(f"No reply ID returned: {result}")
         
-        logger.info(f"[INSTAGRAM COMMENTS] ✓ Reply posted successfully")
-        logger.info(f"[INSTAGRAM COMMENTS] Reply ID: {reply_id}")
+        logger.info("[INSTAGRAM COMMENTS] ✓ Reply posted successfully (ID: %s)", reply_id)
+        invalidate_post_comments()
         
         return reply_id
         
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        error_code = None
-        
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-                        error_code = error_obj.get('code')
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ HTTP error replying to comment: {error_data}")
-        logger.error(f"[INSTAGRAM COMMENTS] Status code: {e.response.status_code}")
-        logger.error(f"[INSTAGRAM COMMENTS] Error message: {error_message}")
-        
-        if error_code == 190 or "expired" in error_message.lower() or "session has expired" in error_message.lower():
-            raise Exception(f"Instagram access token has expired. {error_message}. Please update your INSTAGRAM_ACCESS_TOKEN.")
-        else:
-            raise Exception(f"Instagram API error: {error_message} (Code: {error_code})")
-            
     except Exception as e:
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ Error replying to comment: {str(e)}")
+        logger.error("[INSTAGRAM COMMENTS] ✗ Error replying to comment: %s", e)
         raise
 
 
-def hide_comment(comment_id: str, hide: bool, access_token: str) -> None:
+async def reply_to_comments_bulk(replies: List[Tuple[str, str]], access_token: str) -> List[Union[str, Exception]]:
+    """
+    Reply to several Instagram comments in batch requests.
+    
+    Args:
+        replies: (comment_id, message) pairs
+        access_token: Instagram access token
+    
+    Returns:
+        One entry per reply, in order: the new reply ID, or the exception that reply failed with
+    """
+    results = await batch_execute(
+        [
+            {"method": "POST", "relative_url": f"{comment_id}/replies", "body": urlencode({"message": message})}
+            for comment_id, message in replies
+        ],
+        access_token
+    )
+    results = [
+        result if isinstance(result, Exception) or result.get("id") else Exception(f"No reply ID returned: {result}")
+        for result in results
+    ]
+    
+    failed = sum(isinstance(r, Exception) for r in results)
+    logger.info("[INSTAGRAM COMMENTS] Posted %d of %d replies", len(results) - failed, len(results))
+    if failed < len(results):
+        invalidate_post_comments()
+    return [result if isinstance(result, Exception) else result["id"] for result in results]
+
+
+async def hide_comment(comment_id: str, hide: bool, access_token: str) -> None:
     """
     Hide or unhide an Instagram comment.
     
@@ -171,10 +506,9 @@ def hide_comment(comment_id: str, hide: bool, access_token: str) -> None:
     Raises:
         Exception: If API call fails
     """
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{comment_id}"
+    url = f"{GRAPH_BASE}/{comment_id}"
     
-    logger.info(f"[INSTAGRAM COMMENTS] {'Hiding' if hide else 'Unhiding'} comment ID: {comment_id}")
+    logger.debug("[INSTAGRAM COMMENTS] %s comment ID: %s", 'Hiding' if hide else 'Unhiding', comment_id)
     
     data = {
         "is_hidden": hide,
@@ -182,36 +516,17 @@ def hide_comment(comment_id: str, hide: bool, access_token: str) -> None:
     }
     
     try:
-        response = requests.post(url, json=data, timeout=30)
-        response.raise_for_status()
-        
-        logger.info(f"[INSTAGRAM COMMENTS] ✓ Comment {'hidden' if hide else 'unhidden'} successfully")
-        
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ HTTP error hiding comment: {error_data}")
-        logger.error(f"[INSTAGRAM COMMENTS] Status code: {e.response.status_code}")
+        await graph_request("POST", url, json=data)
         
-        raise Exception(f"Instagram API error: {error_message}")
+        logger.info("[INSTAGRAM COMMENTS] ✓ Comment %s successfully", 'hidden' if hide else 'unhidden')
+        invalidate_post_comments()
         
     except Exception as e:
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ Error hiding comment: {str(e)}")
+        logger.error("[INSTAGRAM COMMENTS] ✗ Error hiding comment: %s", e)
         raise
 
 
-def post_first_comment(media_id: str, text: str, access_token: str) -> str:
+async def post_first_comment(media_id: str, text: str, access_token: str) -> str:
     """
     Post a comment on an Instagram media (for "be the first to comment" feature).
     
@@ -226,12 +541,10 @@ def post_first_comment(media_id: str, text: str, access_token: str) -> str:
     Raises:
         Exception: If API call fails
     """
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{media_id}/comments"
+    url = f"{GRAPH_BASE}/{media_id}/comments"
     
-    logger.info(f"[INSTAGRAM COMMENTS] Posting first comment on media ID: {media_id}")
-    logger.info(f"[INSTAGRAM COMMENTS] Comment text: {text[:50]}...")
-    logger.info(f"[INSTAGRAM COMMENTS] API URL: {url}")
+    logger.debug("[INSTAGRAM COMMENTS] Posting first comment on media ID: %s", media_id)
+    logger.debug("[INSTAGRAM COMMENTS] Comment text: %s...", text[:50])
     
     data = {
         "message": text,
@@ -239,80 +552,26 @@ def post_first_comment(media_id: str, text: str, access_token: str) -> str:
     }
     
     try:
-        response = requests.post(url, json=data, timeout=30)
-        response.raise_for_status()
-        result = response.json()
+        result = await graph_request("POST", url, json=data)
         
         comment_id = result.get("id")
         
         if not comment_id:
-            logger.error(f"[INSTAGRAM COMMENTS] ✗ No comment ID in response: {result}")
+            logger.error("[INSTAGRAM COMMENTS] ✗ No comment ID in response: %s", result)
             raise Exception(f"No comment ID returned: {result}")
         
-        logger.info(f"[INSTAGRAM COMMENTS] ✓ First comment posted successfully")
-        logger.info(f"[INSTAGRAM COMMENTS] Comment ID: {comment_id}")
+        invalidate_post_comments(media_id)
         
-        return comment_id
-        
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        error_code = None
+        logger.info("[INSTAGRAM COMMENTS] ✓ First comment posted successfully (ID: %s)", comment_id)
         
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-                        error_code = error_obj.get('code')
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ HTTP error posting comment: {error_data}")
-        logger.error(f"[INSTAGRAM COMMENTS] Status code: {e.response.status_code}")
-        logger.error(f"[INSTAGRAM COMMENTS] Error message: {error_message}")
+        return comment_id
         
-        if error_code == 190 or "expired" in error_message.lower() or "session has expired" in error_message.lower():
-            raise Exception(f"Instagram access token has expired. {error_message}. Please update your INSTAGRAM_ACCESS_TOKEN.")
-        else:
-            raise Exception(f"Instagram API error: {error_message} (Code: {error_code})")
-            
     except Exception as e:
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ Error posting comment: {str(e)}")
+        logger.error("[INSTAGRAM COMMENTS] ✗ Error posting comment: %s", e)
         raise
 
 
-def pin_comment(comment_id: str, access_token: str) -> bool:
-    """
-    Pin a comment on Instagram.
-    
-    NOTE: Instagram Graph API may not support pinning comments programmatically.
-    This function is a placeholder and will attempt the operation but may not be supported.
-    
-    Args:
-        comment_id: Instagram comment ID
-        access_token: Instagram access token
-    
-    Returns:
-        True if successful, False if not supported
-    
-    Raises:
-        Exception: If API call fails with error other than "not supported"
-    """
-    logger.warning(f"[INSTAGRAM COMMENTS] Pin comment feature may not be supported by Instagram Graph API")
-    logger.info(f"[INSTAGRAM COMMENTS] Attempting to pin comment ID: {comment_id}")
-    
-    # Instagram Graph API doesn't currently support pinning comments programmatically
-    # This would need to be done manually through the Instagram app
-    # We'll log this and return False to indicate it's not supported
-    
-    logger.info(f"[INSTAGRAM COMMENTS] ⚠ Pin comment not supported via API - must be done manually in Instagram app")
-    return False
-
-
-def set_comments_enabled(media_id: str, enabled: bool, access_token: str) -> bool:
+async def set_comments_enabled(media_id: str, enabled: bool, access_token: str) -> bool:
     """
     Enable or disable comments on an Instagram post.
     
@@ -330,10 +589,9 @@ def set_comments_enabled(media_id: str, enabled: bool, access_token: str) -> boo
     Raises:
         Exception: If API call fails
     """
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{media_id}"
+    url = f"{GRAPH_BASE}/{media_id}"
     
-    logger.info(f"[INSTAGRAM COMMENTS] {'Enabling' if enabled else 'Disabling'} comments on media ID: {media_id}")
+    logger.debug("[INSTAGRAM COMMENTS] %s comments on media ID: %s", 'Enabling' if enabled else 'Disabling', media_id)
     
     data = {
         "comment_enabled": enabled,
@@ -341,65 +599,20 @@ def set_comments_enabled(media_id: str, enabled: bool, access_token: str) -> boo
     }
     
     try:
-        response = requests.post(url, json=data, timeout=30)
-        response.raise_for_status()
+        await graph_request("POST", url, json=data)
         
-        logger.info(f"[INSTAGRAM COMMENTS] ✓ Comments {'enabled' if enabled else 'disabled'} successfully")
+        logger.info("[INSTAGRAM COMMENTS] ✓ Comments %s successfully", 'enabled' if enabled else 'disabled')
         return True
         
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
+    except InstagramAPIError as e:
         # Check if this is a "not supported" error
-        if "not supported" in error_message.lower() or "invalid parameter" in error_message.lower():
-            logger.warning(f"[INSTAGRAM COMMENTS] ⚠ Setting comments enabled/disabled not supported after publishing")
+        if "not supported" in e.message.lower() or "invalid parameter" in e.message.lower():
+            logger.warning("[INSTAGRAM COMMENTS] ⚠ Setting comments enabled/disabled not supported after publishing")
             return False
         
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ HTTP error setting comments: {error_data}")
-        logger.error(f"[INSTAGRAM COMMENTS] Status code: {e.response.status_code}")
-        
-        raise Exception(f"Instagram API error: {error_message}")
+        logger.error("[INSTAGRAM COMMENTS] ✗ Error setting comments: %s", e)
+        raise
         
     except Exception as e:
-        logger.error(f"[INSTAGRAM COMMENTS] ✗ Error setting comments: {str(e)}")
+        logger.error("[INSTAGRAM COMMENTS] ✗ Error setting comments: %s", e)
         raise
-
-
-def set_like_count_hidden(media_id: str, hidden: bool, access_token: str) -> bool:
-    """
-    Hide or show like count on an Instagram post.
-    
-    NOTE: This feature may not be available via Instagram Graph API.
-    Like count visibility is typically controlled in Instagram app settings.
-    
-    Args:
-        media_id: Instagram media ID
-        hidden: True to hide like count, False to show
-        access_token: Instagram access token
-    
-    Returns:
-        True if successful, False if not supported
-    
-    Raises:
-        Exception: If API call fails
-    """
-    logger.warning(f"[INSTAGRAM COMMENTS] Hide like count feature may not be supported by Instagram Graph API")
-    logger.info(f"[INSTAGRAM COMMENTS] Attempting to {'hide' if hidden else 'show'} like count on media ID: {media_id}")
-    
-    # Instagram Graph API doesn't currently support hiding like counts programmatically
-    # This is controlled through Instagram app settings
-    # We'll log this and return False to indicate it's not supported
-    
-    logger.info(f"[INSTAGRAM COMMENTS] ⚠ Hide like count not supported via API - must be configured in Instagram app settings")
-    return False
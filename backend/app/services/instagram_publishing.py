@@ -1,23 +1,28 @@
-import requests
-import os
-import time
+import asyncio
+import random
 import logging
+from typing import Optional
+from .instagram_comments import GRAPH_BASE, graph_request
 
-# Configure logging for Instagram publishing
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
-def create_media_container(instagram_user_id: str, image_url: str, caption: str, access_token: str) -> str:
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{instagram_user_id}/media"
+# Container status polling: exponential backoff from 2s, capped at 15s per wait.
+# Most images are ready within a few seconds; slow ones get up to 5 minutes.
+CONTAINER_POLL_BASE_SECONDS = 2.0
+CONTAINER_POLL_MAX_SECONDS = 15.0
+CONTAINER_POLL_MAX_ATTEMPTS = 20
+CONTAINER_POLL_MAX_WAIT_SECONDS = 300.0
+
+
+class PublishError(Exception):
+    """An expected publishing failure (missing input, unusable media, upload or processing failure)."""
+
+async def create_media_container(instagram_user_id: str, image_url: str, caption: str, access_token: str) -> str:
+    url = f"{GRAPH_BASE}/{instagram_user_id}/media"
     
-    logger.info(f"[INSTAGRAM] Creating media container...")
-    logger.info(f"[INSTAGRAM] Image URL: {image_url}")
-    logger.info(f"[INSTAGRAM] Caption length: {len(caption) if caption else 0} characters")
-    logger.info(f"[INSTAGRAM] API URL: {url}")
+    logger.debug("[INSTAGRAM] Creating media container...")
+    logger.debug("[INSTAGRAM] Image URL: %s", image_url)
+    logger.debug("[INSTAGRAM] Caption length: %d characters", len(caption) if caption else 0)
     
     data = {
         "image_url": image_url,
@@ -27,141 +32,120 @@ def create_media_container(instagram_user_id: str, image_url: str, caption: str,
         data["caption"] = caption
 
     try:
-        response = requests.post(url, json=data, timeout=90)
-        response.raise_for_status()
-        result = response.json()
+        # Resending only risks an unused extra container; the media_publish call is never resent
+        result = await graph_request("POST", url, json=data, timeout=90, idempotent=True)
         container_id = result.get("id")
         
         if not container_id:
-            logger.error(f"[INSTAGRAM] ✗ No container ID in response: {result}")
-            raise Exception(f"No container ID returned: {result}")
+            logger.error("[INSTAGRAM] ✗ No container ID in response: %s", result)
+            raise PublishError(f"No container ID returned: {result}")
         
-        logger.info(f"[INSTAGRAM] ✓ Media container created successfully")
-        logger.info(f"[INSTAGRAM] Container ID: {container_id}")
+        logger.debug("[INSTAGRAM] ✓ Media container created (ID: %s)", container_id)
         return container_id
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        error_code = None
-        error_type = None
-        
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-                        error_code = error_obj.get('code')
-                        error_type = error_obj.get('type')
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
-        logger.error(f"[INSTAGRAM] ✗ HTTP error creating container: {error_data}")
-        logger.error(f"[INSTAGRAM] Status code: {e.response.status_code}")
-        logger.error(f"[INSTAGRAM] Error message: {error_message}")
-        
-        # Create a more descriptive exception with the error message
-        if error_code == 190 or "expired" in error_message.lower() or "session has expired" in error_message.lower():
-            raise Exception(f"Instagram access token has expired. {error_message}. Please update your INSTAGRAM_ACCESS_TOKEN in the .env file or channel settings.")
-        else:
-            raise Exception(f"Instagram API error: {error_message} (Code: {error_code}, Type: {error_type})")
     except Exception as e:
-        logger.error(f"[INSTAGRAM] ✗ Error creating container: {str(e)}")
+        logger.error("[INSTAGRAM] ✗ Error creating container: %s", e)
         raise
 
-def publish_media_container(instagram_user_id: str, container_id: str, access_token: str) -> str:
-    api_version = os.getenv("INSTAGRAM_API_VERSION", "v21.0")
-    url = f"https://graph.facebook.com/{api_version}/{instagram_user_id}/media_publish"
+async def publish_media_container(instagram_user_id: str, container_id: str, access_token: str) -> str:
+    url = f"{GRAPH_BASE}/{instagram_user_id}/media_publish"
     
-    logger.info(f"[INSTAGRAM] Publishing media container...")
-    logger.info(f"[INSTAGRAM] Container ID: {container_id}")
-    logger.info(f"[INSTAGRAM] API URL: {url}")
+    logger.debug("[INSTAGRAM] Publishing media container %s", container_id)
     
     data = {"creation_id": container_id, "access_token": access_token}
     
     try:
-        response = requests.post(url, json=data, timeout=90)
-        response.raise_for_status()
-        result = response.json()
+        result = await graph_request("POST", url, json=data, timeout=90)
         media_id = result.get("id")
         
         if not media_id:
-            logger.error(f"[INSTAGRAM] ✗ No media ID in response: {result}")
-            raise Exception(f"No media ID returned: {result}")
+            logger.error("[INSTAGRAM] ✗ No media ID in response: %s", result)
+            raise PublishError(f"No media ID returned: {result}")
         
-        logger.info(f"[INSTAGRAM] ✓ Media container published successfully")
-        logger.info(f"[INSTAGRAM] Media ID: {media_id}")
+        logger.debug("[INSTAGRAM] ✓ Media container published (media ID: %s)", media_id)
         return media_id
-    except requests.exceptions.HTTPError as e:
-        error_data = {}
-        error_message = "Unknown error"
-        error_code = None
-        error_type = None
-        
-        try:
-            if e.response.text:
-                error_data = e.response.json()
-                if isinstance(error_data, dict) and 'error' in error_data:
-                    error_obj = error_data['error']
-                    if isinstance(error_obj, dict):
-                        error_message = error_obj.get('message', str(e))
-                        error_code = error_obj.get('code')
-                        error_type = error_obj.get('type')
-        except:
-            error_data = {"raw_response": e.response.text[:500] if e.response.text else "No response"}
-        
-        logger.error(f"[INSTAGRAM] ✗ HTTP error publishing container: {error_data}")
-        logger.error(f"[INSTAGRAM] Status code: {e.response.status_code}")
-        logger.error(f"[INSTAGRAM] Error message: {error_message}")
-        
-        # Create a more descriptive exception with the error message
-        if error_code == 190 or "expired" in error_message.lower() or "session has expired" in error_message.lower():
-            raise Exception(f"Instagram access token has expired. {error_message}. Please update your INSTAGRAM_ACCESS_TOKEN in the .env file or channel settings.")
-        else:
-            raise Exception(f"Instagram API error: {error_message} (Code: {error_code}, Type: {error_type})")
     except Exception as e:
-        logger.error(f"[INSTAGRAM] ✗ Error publishing container: {str(e)}")
+        logger.error("[INSTAGRAM] ✗ Error publishing container: %s", e)
         raise
 
-def post_to_instagram(image_url: str, caption: str, user_id: str, token: str):
+async def get_container_status(container_id: str, access_token: str) -> Optional[str]:
+    """
+    Read a media container's processing status, e.g. "IN_PROGRESS", "FINISHED" or "ERROR".
+    """
+    url = f"{GRAPH_BASE}/{container_id}"
+    
+    result = await graph_request("GET", url, params={"fields": "status_code,status", "access_token": access_token})
+    status_code = result.get("status_code")
+    if status_code == "ERROR":
+        logger.error("[INSTAGRAM] ✗ Container processing failed: %s", result.get("status"))
+    return status_code
+
+
+async def wait_for_container(
+    container_id: str,
+    access_token: str,
+    max_wait_seconds: float = CONTAINER_POLL_MAX_WAIT_SECONDS
+) -> None:
+    """
+    Poll a media container until Instagram has finished processing it.
+    Waits back off exponentially with jitter, so quick images publish within seconds.
+    
+    Args:
+        container_id: Media container ID from create_media_container
+        access_token: Instagram access token
+        max_wait_seconds: Give up once this much time has passed
+    
+    Raises:
+        Exception: If processing fails, expires or does not finish in time
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + max_wait_seconds
+    
+    for attempt in range(CONTAINER_POLL_MAX_ATTEMPTS):
+        status_code = await get_container_status(container_id, access_token)
+        
+        if status_code == "FINISHED":
+            return
+        if status_code in ("ERROR", "EXPIRED"):
+            raise PublishError(f"Instagram could not process the media (container status: {status_code})")
+        
+        delay = min(CONTAINER_POLL_MAX_SECONDS, CONTAINER_POLL_BASE_SECONDS * 2 ** attempt) + random.uniform(0, 1)
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        delay = min(delay, remaining)
+        logger.debug("[INSTAGRAM] Container status: %s, checking again in %.1fs", status_code, delay)
+        await asyncio.sleep(delay)
+    
+    raise PublishError(f"Instagram did not finish processing the media within {max_wait_seconds:.0f} seconds")
+
+
+async def post_to_instagram(image_url: str, caption: str, user_id: str, token: str):
     """
     Orchestrates the Instagram posting flow:
     1. Create Media Container
-    2. Wait for processing
+    2. Wait for processing (polls container status)
     3. Publish Container
     """
-    logger.info(f"[INSTAGRAM] ========================================")
-    logger.info(f"[INSTAGRAM] Starting Instagram post process")
-    logger.info(f"[INSTAGRAM] ========================================")
+    logger.info("[INSTAGRAM] Starting Instagram post process")
     
     try:
         # 1. Create Container
-        logger.info(f"[INSTAGRAM] Step 1/3: Creating media container...")
-        container_id = create_media_container(user_id, image_url, caption, token)
+        logger.debug("[INSTAGRAM] Step 1/3: Creating media container...")
+        container_id = await create_media_container(user_id, image_url, caption, token)
         
-        # 2. Wait (Instagram needs time to process the image)
-        # Instagram typically needs 30-60 seconds to process the image
-        wait_time = 60
-        logger.info(f"[INSTAGRAM] Step 2/3: Waiting {wait_time} seconds for Instagram to process the image...")
-        logger.info(f"[INSTAGRAM] This is required for Instagram to download and process the image from the URL")
-        time.sleep(wait_time)
-        logger.info(f"[INSTAGRAM] ✓ Wait completed, proceeding to publish...")
+        # 2. Wait until Instagram has downloaded and processed the image
+        logger.debug("[INSTAGRAM] Step 2/3: Waiting for Instagram to process the image...")
+        await wait_for_container(container_id, token)
+        logger.debug("[INSTAGRAM] ✓ Processing finished, proceeding to publish...")
         
         # 3. Publish
-        logger.info(f"[INSTAGRAM] Step 3/3: Publishing media container...")
-        media_id = publish_media_container(user_id, container_id, token)
+        logger.debug("[INSTAGRAM] Step 3/3: Publishing media container...")
+        media_id = await publish_media_container(user_id, container_id, token)
         
-        logger.info(f"[INSTAGRAM] ========================================")
-        logger.info(f"[INSTAGRAM] ✓ Instagram post completed successfully!")
-        logger.info(f"[INSTAGRAM] Media ID: {media_id}")
-        logger.info(f"[INSTAGRAM] ========================================")
+        logger.info("[INSTAGRAM] ✓ Instagram post completed successfully (media ID: %s)", media_id)
         
         return media_id
         
     except Exception as e:
-        logger.error(f"[INSTAGRAM] ========================================")
-        logger.error(f"[INSTAGRAM] ✗ Instagram posting failed")
-        logger.error(f"[INSTAGRAM] Error: {str(e)}")
-        logger.error(f"[INSTAGRAM] ========================================")
+        logger.error("[INSTAGRAM] ✗ Instagram posting failed: %s", e)
         raise e
@@ -0,0 +1,142 @@
+"""
+Response Cache
+Short-lived in-process cache for hot read endpoints (dashboard polling of posts, channels, profile)
+
+Invalidation listens to this process's sessions only, so the cache assumes a single
+worker; it turns itself off when WEB_CONCURRENCY says uvicorn runs more than one.
+"""
+
+import functools
+import hashlib
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models import models
+
+logger = logging.getLogger(__name__)
+
+# Seconds a cached response stays valid; 0 disables caching
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "30"))
+
+# Other workers' writes never reach this process's invalidation hooks
+if int(os.getenv("WEB_CONCURRENCY", "1")) > 1 and RESPONSE_CACHE_TTL_SECONDS > 0:
+    logger.warning("[CACHE] WEB_CONCURRENCY > 1; response cache disabled")
+    RESPONSE_CACHE_TTL_SECONDS = 0
+RESPONSE_CACHE_MAX_ENTRIES = 256
+
+# Models whose writes make cached responses stale
+CACHED_MODELS = (models.Post, models.Channel, models.Asset)
+
+# Extra keyword argument the decorator adds to wrapped endpoints
+REQUEST_PARAM = "cache_request"
+
+_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+# Bumped by every invalidation; a response computed under an older generation may
+# predate the write and is not cached
+_generation = 0
+
+
+def cached_response(prefix: str):
+    """
+    Cache an endpoint's JSON body, keyed by prefix and query parameters.
+    Session dependencies are left out of the key. Exceptions (e.g. 404s) are never cached.
+    
+    Cached bodies carry a weak ETag; a poll whose If-None-Match still matches gets an
+    empty 304 instead of the full list.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            request: Request = kwargs.pop(REQUEST_PARAM)
+            if RESPONSE_CACHE_TTL_SECONDS <= 0:
+                return func(*args, **kwargs)
+
+            key = (prefix,) + tuple(sorted(
+                (name, value) for name, value in kwargs.items() if not isinstance(value, Session)
+            ))
+            now = time.monotonic()
+
+            with _cache_lock:
+                entry = _cache.get(key)
+                generation = _generation
+            if entry is None or entry[0] <= now:
+                # Column projections (with_entities) come back as Rows; encode them as dicts
+                result = jsonable_encoder(func(*args, **kwargs), custom_encoder={Row: lambda row: row._asdict()})
+                body = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+                entry = (now + RESPONSE_CACHE_TTL_SECONDS, body, f'W/"{hashlib.sha1(body).hexdigest()}"')
+
+                with _cache_lock:
+                    if generation == _generation:
+                        _cache[key] = entry
+                        _cache.move_to_end(key)
+                        while len(_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                            _cache.popitem(last=False)
+
+            _, body, etag = entry
+            # no-cache: browsers may keep the body but must revalidate with If-None-Match
+            headers = {"ETag": etag, "Cache-Control": "no-cache"}
+            if request.headers.get("if-none-match") == etag:
+                return Response(status_code=304, headers=headers)
+            return Response(content=body, media_type="application/json", headers=headers)
+
+        # Ask FastAPI to inject the Request alongside the endpoint's own parameters
+        signature = inspect.signature(func)
+        wrapper.__signature__ = signature.replace(parameters=[
+            *signature.parameters.values(),
+            inspect.Parameter(REQUEST_PARAM, inspect.Parameter.KEYWORD_ONLY, annotation=Request),
+        ])
+        return wrapper
+    return decorator
+
+
+def invalidate_responses() -> None:
+    """Drop every cached response, and any response still being computed from before the write."""
+    global _generation
+    with _cache_lock:
+        _generation += 1
+        _cache.clear()
+
+
+@event.listens_for(SessionLocal, "after_flush")
+def _mark_stale_responses(session, flush_context):
+    """Flag the session when a flush writes posts, channels or assets."""
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, CACHED_MODELS):
+            session.info["invalidate_responses"] = True
+            return
+
+
+@event.listens_for(SessionLocal, "do_orm_execute")
+def _mark_stale_on_bulk_write(orm_execute_state):
+    """Flag the session for ORM-enabled INSERT/UPDATE/DELETE statements, which bypass flush."""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, CACHED_MODELS):
+        orm_execute_state.session.info["invalidate_responses"] = True
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_after_commit(session):
+    """Invalidate cached responses once a flagged write is committed."""
+    if session.info.pop("invalidate_responses", False):
+        invalidate_responses()
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _discard_stale_flag(session):
+    session.info.pop("invalidate_responses", None)
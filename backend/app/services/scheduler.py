@@ -1,108 +1,374 @@
 import asyncio
 import logging
 import os
-import requests
-from datetime import datetime, timezone
+import tempfile
+import httpx
+import orjson
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_, bindparam, func, or_, select, update
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy.orm import Session
+from ..config import get_settings
 from ..database import SessionLocal
 from ..models import models
-from typing import Optional
+from .credentials import CredentialsError, resolve_credentials
+from .http_clients import get_http_client
+from .instagram_comments import InstagramAPIError
+from .instagram_publishing import PublishError, post_to_instagram
+from typing import Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
 # Global flag to track if scheduler is running
 _scheduler_task: Optional[asyncio.Task] = None
 
+# Open handle on the scheduler lock file; held for the lifetime of the process
+_scheduler_lock_file = None
+
+FREEIMAGE_UPLOAD_URL = "https://freeimage.host/api/1/upload"
+
+# Post statuses the scheduler publishes once scheduled_time has passed
+DUE_STATUSES = ("scheduled", "approved")
+
+# Most due posts claimed per scheduler run; the rest are claimed straight after
+SCHEDULER_BATCH_SIZE = 50
+
+# Most claimed posts published at once. Every post goes to the one configured
+# Instagram account, so this also bounds the load on that account's rate limit.
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "4"))
+
+# A post still "publishing" this long after its last attempt started was abandoned
+# (the process died mid-publish); the longest real publish is a few minutes
+PUBLISHING_STALE_SECONDS = int(os.getenv("PUBLISHING_STALE_SECONDS", "900"))
+
+
+class _db_utcnow(FunctionElement):
+    """The database's current UTC time, comparable with stored scheduled_time values."""
+    type = models.UTCDateTime()
+    inherit_cache = True
+
+
+@compiles(_db_utcnow)
+def _compile_db_utcnow(element, compiler, **kw):
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(_db_utcnow, "sqlite")
+def _compile_db_utcnow_sqlite(element, compiler, **kw):
+    # SQLite compares DATETIME columns as text; match SQLAlchemy's stored
+    # "YYYY-MM-DD HH:MM:SS.ffffff" form so the probe and the claim agree to the microsecond
+    return "(strftime('%Y-%m-%d %H:%M:%f', 'now') || '000')"
+
+
+# Scheduler statements, built once at import; each run only binds :now.
+# SQLAlchemy's compiled cache then reuses their SQL instead of rebuilding it per wake.
+
+# Earliest scheduled_time among posts waiting to be published, and the database's
+# current time. Due-ness is judged on the database clock (here and in the claim),
+# so a skewed app clock can't make the probe and the claim disagree.
+_NEXT_DUE_STMT = select(func.min(models.Post.scheduled_time), _db_utcnow()).where(
+    models.Post.status.in_(DUE_STATUSES),
+    models.Post.scheduled_time.isnot(None)
+)
+
+# Claim due posts (status scheduled/approved with a time that has passed)
+# by marking them publishing in one UPDATE ... RETURNING, so a batch costs
+# one claim commit instead of one per post. On PostgreSQL, SKIP LOCKED
+# keeps a concurrent claim from picking the same rows.
+_CLAIM_DUE_STMT = (
+    update(models.Post)
+    .where(models.Post.id.in_(
+        select(models.Post.id).where(
+            models.Post.status.in_(DUE_STATUSES),
+            models.Post.scheduled_time.isnot(None),
+            models.Post.scheduled_time <= _db_utcnow()
+        ).limit(SCHEDULER_BATCH_SIZE).with_for_update(skip_locked=True)
+    ))
+    .values(status="publishing", last_publish_attempt_at=bindparam("now"), last_error=None)
+    .returning(models.Post)
+)
+
+# Set by notify_scheduler() so the loop re-checks the next due time right away
+_wakeup = asyncio.Event()
+_scheduler_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+# IDs of posts with a publish running in this process. Only touched from the
+# event loop (scheduler batches and async background tasks), so no lock is needed.
+_inflight_posts: Set[int] = set()
+
+def notify_scheduler() -> None:
+    """
+    Wake the scheduler loop early (a post was scheduled, rescheduled or approved).
+    Safe to call from sync endpoints running in worker threads. Posts changed by
+    other worker processes are still picked up within the scheduler interval.
+    """
+    if _scheduler_event_loop is None:
+        return
+    try:
+        _scheduler_event_loop.call_soon_threadsafe(_wakeup.set)
+    except RuntimeError:
+        # Event loop already closed (shutdown)
+        pass
+
+
+def _seconds_until_next_due(db: Session, interval_seconds: int) -> float:
+    """Seconds until the earliest scheduled post is due (0 if one already is), capped at interval_seconds."""
+    # Core select of one aggregate; no ORM entities are built on this per-wake probe
+    next_due, db_now = db.execute(_NEXT_DUE_STMT).one()
+    
+    if next_due is None:
+        return interval_seconds
+    return min(interval_seconds, max(0.0, (next_due - db_now).total_seconds()))
+
+
+def _acquire_scheduler_lock() -> bool:
+    """
+    Take an exclusive, non-blocking lock on SCHEDULER_LOCK_FILE so that only one
+    worker process (e.g. under `uvicorn --workers N`) runs the scheduler loop.
+    The OS releases the lock automatically when the process exits.
+    
+    Returns:
+        True if this process holds the lock, False if another process does.
+    """
+    global _scheduler_lock_file
+    
+    if _scheduler_lock_file is not None:
+        return True
+    
+    lock_path = os.getenv(
+        "SCHEDULER_LOCK_FILE",
+        os.path.join(tempfile.gettempdir(), "velvetqueue_scheduler.lock")
+    )
+    lock_file = open(lock_path, "a+")
+    try:
+        if os.name == "nt":
+            import msvcrt
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return False
+    
+    _scheduler_lock_file = lock_file
+    return True
+
 
 async def scheduler_loop(interval_seconds: int = 30):
     """
-    Background task that periodically checks for scheduled posts and publishes them.
+    Background task that publishes scheduled posts when they fall due.
+    
+    Between runs it sleeps until the earliest scheduled_time, or until
+    notify_scheduler() is called, instead of scanning on a fixed tick.
     
     Args:
-        interval_seconds: How often to check for due posts (default: 30 seconds)
+        interval_seconds: Longest sleep between checks for due posts (default: 30 seconds)
     """
-    logger.info(f"[SCHEDULER] Starting scheduler loop (interval: {interval_seconds}s)")
+    logger.info("[SCHEDULER] Starting scheduler loop (interval: %ss)", interval_seconds)
     
     while True:
         try:
-            # Sleep first to prevent tight loop on error
-            await asyncio.sleep(interval_seconds)
+            # Clear before checking, so a notify during the check still wakes the wait below
+            _wakeup.clear()
+            
+            # Database work runs in a worker thread so it never stalls the event loop
+            delay = await asyncio.to_thread(_probe_next_due, interval_seconds)
             
-            # Open a new DB session for this iteration
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(_wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            
+            due_posts, assets = await asyncio.to_thread(_claim_due_posts)
+            
+            # Publish the batch concurrently; each post records its own outcome
+            semaphore = asyncio.Semaphore(SCHEDULER_CONCURRENCY)
+            results = await asyncio.gather(*[
+                _publish_claimed_post(post, assets.get(post.media_assets[0]) if post.media_assets else None, semaphore)
+                for post in due_posts
+            ], return_exceptions=True)
+            for post, result in zip(due_posts, results):
+                if isinstance(result, Exception):
+                    logger.error("[SCHEDULER] Unhandled error publishing post id=%s: %s", post.id, result)
+                
+        except Exception as e:
+            logger.error("[SCHEDULER] Unhandled error in scheduler loop: %s", e, exc_info=True)
+            # Sleep a bit longer if we hit a loop-level crash to avoid log spam
+            await asyncio.sleep(5)
+
+
+def stale_publishing(now: datetime):
+    """
+    SQL predicate matching posts left in "publishing" by a publish that never finished.
+    
+    Manual publishes run as in-memory background tasks, so a crash or restart mid-publish
+    leaves the row claimed with nothing working on it.
+    """
+    return and_(
+        models.Post.status == "publishing",
+        or_(
+            models.Post.last_publish_attempt_at.is_(None),
+            models.Post.last_publish_attempt_at < now - timedelta(seconds=PUBLISHING_STALE_SECONDS)
+        )
+    )
+
+
+def _fail_stale_publishing(db: Session) -> None:
+    """Mark abandoned publishes failed, so they show up and can be published again."""
+    stale = db.execute(
+        update(models.Post)
+        .where(stale_publishing(datetime.now(timezone.utc)))
+        .values(status="failed", last_error="Publishing was interrupted before it finished; publish again to retry")
+        .returning(models.Post.id)
+    ).scalars().all()
+    db.commit()
+    if stale:
+        logger.warning("[SCHEDULER] Marked %d abandoned publish(es) as failed: %s", len(stale), stale)
+
+
+def _probe_next_due(interval_seconds: int) -> float:
+    """Run _seconds_until_next_due in a session of its own (called in a worker thread)."""
+    db = SessionLocal()
+    try:
+        _fail_stale_publishing(db)
+        return _seconds_until_next_due(db, interval_seconds)
+    finally:
+        db.close()
+
+
+def _claim_due_posts() -> Tuple[List[models.Post], Dict[int, models.Asset]]:
+    """
+    Claim a batch of due posts and load their images (called in a worker thread).
+    
+    Returns:
+        The claimed posts, and their first media assets keyed by asset ID
+    """
+    db = SessionLocal()
+    try:
+        # Use UTC for all time comparisons
+        now = datetime.now(timezone.utc)
+        logger.debug("[SCHEDULER] Tick at %s", now)
+        
+        # Claim due posts in one UPDATE ... RETURNING (see _CLAIM_DUE_STMT)
+        due_posts = db.execute(_CLAIM_DUE_STMT, {"now": now}).scalars().all()
+        db.commit()
+        
+        if due_posts:
+            logger.info("[SCHEDULER] Claimed %d due post(s)", len(due_posts))
+        
+        # Load every post's image in one query rather than one per publish
+        asset_ids = {post.media_assets[0] for post in due_posts if post.media_assets}
+        assets = {
+            asset.id: asset
+            for asset in db.query(models.Asset).filter(models.Asset.id.in_(asset_ids))
+        } if asset_ids else {}
+        return due_posts, assets
+    finally:
+        db.close()
+
+
+async def _publish_claimed_post(post: models.Post, asset: Optional[models.Asset], semaphore: asyncio.Semaphore) -> None:
+    """
+    Publish one post claimed by the scheduler, in its own session so concurrent
+    publishes never share one. Failures are recorded on the post, not raised.
+    """
+    if post.id in _inflight_posts:
+        logger.warning("[SCHEDULER] Post id=%s is already being published, skipping", post.id)
+        return
+    _inflight_posts.add(post.id)
+    
+    try:
+        async with semaphore:
             db = SessionLocal()
             try:
-                # Use UTC for all time comparisons
-                now = datetime.now(timezone.utc)
-                logger.info(f"[SCHEDULER] Tick at {now.isoformat()}")
-                
-                # Find posts that are scheduled and due
-                # Filter strict: status IS scheduled AND time IS NOT NULL AND time <= now
-                # We also check for 'approved' status if auto-schedule didn't happen correctly,
-                # but STRICTLY relying on 'scheduled' is safer. 
-                # Per diagnosis, let's stick to 'scheduled' to avoid accidental publishing of un-scheduled work.
-                # However, previous code allowed 'approved' too. Let's keep it safe:
-                # Only publish if it has a TIME set.
-                due_posts = db.query(models.Post).filter(
-                    (models.Post.status == "scheduled") | (models.Post.status == "approved"),
-                    models.Post.scheduled_time.isnot(None),
-                    models.Post.scheduled_time <= now
-                ).all()
-                
-                if due_posts:
-                    logger.info(f"[SCHEDULER] Found {len(due_posts)} due post(s)")
+                # Attach the already-loaded rows to this session without re-selecting them
+                post = db.merge(post, load=False)
+                if asset is not None:
+                    asset = db.merge(asset, load=False)
+            
+                logger.debug("[SCHEDULER] Processing post id=%s", post.id)
+                try:
+                    # Success handling is done inside publish_post_now (updates to 'published').
+                    # The 'already published' guard in publish_post_now() prevents double-publishing
+                    # if the scheduler restarts; the claim above keeps one post out of two batches.
+                    await publish_post_now(db, post, asset=asset)
+                    logger.info("[SCHEDULER] ✓ Successfully processed post id=%s", post.id)
+            
+                except Exception as e:
+                    # Catch per-post exceptions so one failure doesn't stop others
+                    # Logic: If publish_post_now failed, it should have already set status='failed'.
+                    # But if the commit inside it failed or something else happened, we ensure it here.
+                    error_msg = str(e)[:1000]
+                    logger.error("[SCHEDULER] ✗ Failed post id=%s: %s", post.id, error_msg)
                 
-                for post in due_posts:
-                    logger.info(f"[SCHEDULER] Processing post id={post.id}")
-                    
+                    # Update DB with failure if not already caught inside helper
                     try:
-                        # Mark as publishing immediately to prevent double-processing
-                        post.status = "publishing"
-                        post.last_publish_attempt_at = now
-                        post.last_error = None
-                        db.commit()
-                        
-                        # Publish the post
-                        publish_post_now(db, post)
-                        
-                        # Success handling is done inside publish_post_now (updates to 'published')
-                        # CLASH HANDLING NOTE:
-                        # Posts are processed sequentially in this loop. Even if multiple posts are scheduled
-                        # for the exact same time, they picked up in one batch and processed one by one.
-                        # The 'already published' guard in publish_post_now() prevents double-publishing 
-                        # if the scheduler restarts or if multiple ticks overlap (though single-instance lock prevents that).
-                        logger.info(f"[SCHEDULER] ✓ Successfully processed post id={post.id}")
-
-                    except Exception as e:
-                        # Catch per-post exceptions so one failure doesn't stop others
-                        # Logic: If publish_post_now failed, it should have already set status='failed'.
-                        # But if the commit inside it failed or something else happened, we ensure it here.
-                        error_msg = str(e)[:1000]
-                        logger.error(f"[SCHEDULER] ✗ Failed post id={post.id}: {error_msg}")
-                        
-                        # Update DB with failure if not already caught inside helper
-                        try:
-                            # Re-fetch or refresh to be safe? 
-                            # Usually helper failure rolls back or commits 'failed'. 
-                            # If we are here, exception bubbled up.
-                            if post.status != "failed" and post.status != "published":
-                                post.status = "failed"
-                                post.last_error = error_msg
-                                db.commit()
-                        except Exception as db_exc:
-                            logger.error(f"[SCHEDULER] Critical DB error updating post {post.id}: {db_exc}")
-                            # If DB is broken, try rollback
-                            db.rollback()
-
+                        if post.status != "failed" and post.status != "published":
+                            await asyncio.to_thread(_set_status, db, post, "failed", last_error=error_msg)
+                    except Exception as db_exc:
+                        logger.error("[SCHEDULER] Critical DB error updating post %s: %s", post.id, db_exc)
+                        # If DB is broken, try rollback
+                        db.rollback()
             finally:
                 db.close()
-                
-        except Exception as e:
-            logger.error(f"[SCHEDULER] Unhandled error in scheduler loop: {str(e)}", exc_info=True)
-            # Sleep a bit longer if we hit a loop-level crash to avoid log spam
-            await asyncio.sleep(5)
+    finally:
+        _inflight_posts.discard(post.id)
 
 
-def publish_post_now(db: Session, post: models.Post) -> str:
+def upload_to_freeimage(abs_path: str, api_key: str) -> str:
+    """
+    Upload a local image to Freeimage.host and return its public URL.
+    httpx streams the multipart body from the open file in chunks, so the
+    image is never buffered in memory as a whole. Goes through the shared
+    client so repeat publishes reuse the pooled TLS connection.
+    """
+    with open(abs_path, 'rb') as image_file:
+        response = get_http_client().post(
+            FREEIMAGE_UPLOAD_URL,
+            data={'key': api_key, 'format': 'json'},
+            files={'source': (os.path.basename(abs_path), image_file)},
+            timeout=60
+        )
+    response.raise_for_status()
+    
+    result = orjson.loads(response.content)
+    
+    if result.get('status_code') == 200:
+        public_url = result.get('image', {}).get('url')
+        if public_url:
+            return public_url
+        raise PublishError("Hosting service did not return a URL")
+    
+    error_msg = result.get('error', {}).get('message', 'Unknown error') if isinstance(result.get('error'), dict) else str(result)
+    raise PublishError(f"Failed to upload image: {error_msg}")
+
+
+def _set_status(db: Session, post: models.Post, status: str, **values) -> None:
+    """
+    Write a post's status, plus any other columns given, with one UPDATE and commit.
+    
+    Skips the unit-of-work diff of an ORM flush; the in-session post is still
+    updated to match, so callers can keep reading post.status.
+    
+    Args:
+        db: Session the post belongs to
+        post: Post to update
+        status: New status
+        **values: Other Post columns to set in the same statement
+    """
+    db.execute(
+        update(models.Post)
+        .where(models.Post.id == post.id)
+        .values(status=status, **values)
+    )
+    db.commit()
+
+
+async def publish_post_now(db: Session, post: models.Post, asset: Optional[models.Asset] = None) -> str:
     """
     Publish a post immediately using the existing Instagram publishing logic.
     
@@ -114,73 +380,46 @@ def publish_post_now(db: Session, post: models.Post) -> str:
     4. Instagram API calls
     5. Success/Failure status updates
     
+    Args:
+        db: Session the post belongs to
+        post: Post to publish
+        asset: The post's first media asset, if the caller already loaded it
+    
     Returns:
         str: Instagram media_id
         
     Raises:
-        Exception: If publishing fails (updates post status to failed before raising)
+        PublishError: For expected failures (media, upload, processing)
+        CredentialsError: If no Instagram credentials are configured
+        InstagramAPIError: If the Graph API rejects a call
+        Exception: Anything unexpected (the post is still marked failed before raising)
     """
-    from .instagram_publishing import post_to_instagram
-    
-    logger.info(f"[PUBLISH] Starting publish for post ID: {post.id}")
+    logger.info("[PUBLISH] Starting publish for post ID: %s", post.id)
     now = datetime.now(timezone.utc)
     
     # 1. IDEMPOTENCY CHECK
     if post.status == "published":
          media_id = post.platform_settings.get("instagram_media_id")
          if media_id:
-             logger.warning(f"[PUBLISH] Post {post.id} already published (media_id={media_id}), skipping")
+             logger.warning("[PUBLISH] Post %s already published (media_id=%s), skipping", post.id, media_id)
              return media_id
     
     try:
-        # 2. RESOLVE CREDENTIALS
-        channel = db.query(models.Channel).filter(models.Channel.platform == "instagram").first()
-        
-        env_user_id = os.getenv("INSTAGRAM_USER_ID")
-        env_token = os.getenv("INSTAGRAM_ACCESS_TOKEN")
-        
-        user_id = None
-        token = None
-        
-        if env_user_id and env_token:
-            # Use .env credentials
-            user_id = env_user_id.strip().strip('"').strip("'")
-            token = env_token.strip().strip('"').strip("'")
-            logger.info(f"[PUBLISH] Using credentials from .env file")
-            
-            # Sync to DB for consistency
-            if channel:
-                channel.credentials = {"user_id": user_id, "access_token": token}
-            else:
-                channel = models.Channel(
-                    platform="instagram",
-                    name="Default Account",
-                    credentials={"user_id": user_id, "access_token": token}
-                )
-                db.add(channel)
-            db.commit()
-            
-        elif channel and channel.credentials:
-            # Fall back to database
-            creds = channel.credentials
-            user_id = creds.get("user_id")
-            token = creds.get("access_token")
-            logger.info(f"[PUBLISH] Using credentials from database")
-            
-        else:
-            raise Exception("No Instagram credentials found. Please set INSTAGRAM_USER_ID and INSTAGRAM_ACCESS_TOKEN in .env file.")
+        settings = get_settings()
         
-        if not user_id or not token:
-            raise Exception("Invalid channel credentials (user_id or token missing)")
+        # 2. RESOLVE CREDENTIALS
+        # (database steps run in a worker thread so they never stall the event loop)
+        user_id, token = await asyncio.to_thread(resolve_credentials, db)
         
         # 3. PREPARE ASSET
         if not post.media_assets:
-            raise Exception("Post has no media assets")
+            raise PublishError("Post has no media assets")
         
         asset_id = post.media_assets[0]
-        asset = db.query(models.Asset).filter(models.Asset.id == asset_id).first()
+        if asset is None or asset.id != asset_id:
+            asset = await asyncio.to_thread(db.get, models.Asset, asset_id)
         if not asset:
-            raise Exception(f"Asset {asset_id} not found")
+            raise PublishError(f"Asset {asset_id} not found")
         
         file_path = asset.file_path
         
@@ -190,82 +429,91 @@ def publish_post_now(db: Session, post: models.Post) -> str:
         else:
             # Local file
             clean_path = file_path.lstrip('./').lstrip('/')
-            base_url = os.getenv("PUBLIC_BASE_URL", "http://localhost:8000")
-            image_url = f"{base_url}/{clean_path}"
+            image_url = f"{settings.public_base_url}/{clean_path}"
         
         # Handle localhost/private IP
         if "localhost" in image_url or "127.0.0.1" in image_url:
-            public_base = os.getenv("PUBLIC_BASE_URL")
-            if public_base and not public_base.startswith("http://localhost") and not public_base.startswith("http://127.0.0.1"):
+            public_base = settings.public_base_url
+            if not public_base.startswith("http://localhost") and not public_base.startswith("http://127.0.0.1"):
                 # Use configured public base URL
                 image_url = image_url.replace("http://localhost:8000", public_base)
                 image_url = image_url.replace("http://127.0.0.1:8000", public_base)
+            elif asset.public_url:
+                # Uploaded by an earlier publish (or a failed attempt) of this asset
+                image_url = asset.public_url
+                logger.debug("[PUBLISH] Reusing hosted image: %s", image_url)
             else:
                 # Upload to Freeimage.host
-                logger.info(f"[PUBLISH] Uploading image to hosting service...")
+                logger.debug("[PUBLISH] Uploading image to hosting service...")
                 abs_path = os.path.abspath(file_path)
                 if not os.path.exists(abs_path):
-                    raise Exception(f"Image file not found: {abs_path}")
-                
-                freeimage_api_key = os.getenv("FREEIMAGE_HOST_API_KEY", "6d207e02198a847aa98d0a27a")
-                upload_url = "https://freeimage.host/api/1/upload"
+                    raise PublishError(f"Image file not found: {abs_path}")
                 
-                with open(abs_path, 'rb') as image_file:
-                    files = {'source': image_file}
-                    data = {'key': freeimage_api_key, 'format': 'json'}
-                    
-                    response = requests.post(upload_url, files=files, data=data, timeout=60)
-                    response.raise_for_status()
-                    
-                    result = response.json()
-                    
-                    if result.get('status_code') == 200:
-                        image_info = result.get('image', {})
-                        public_url = image_info.get('url')
-                        if public_url:
-                            image_url = public_url
-                            logger.info(f"[PUBLISH] ✓ Image uploaded successfully: {image_url}")
-                        else:
-                            raise Exception("Hosting service did not return a URL")
-                    else:
-                        error_msg = result.get('error', {}).get('message', 'Unknown error') if isinstance(result.get('error'), dict) else str(result)
-                        raise Exception(f"Failed to upload image: {error_msg}")
+                image_url = await asyncio.to_thread(upload_to_freeimage, abs_path, settings.freeimage_api_key)
+                logger.info("[PUBLISH] ✓ Image uploaded successfully: %s", image_url)
+                # Saved with the post's status commit, success or failure, so retries skip the upload
+                asset.public_url = image_url
         
         # 4. PUBLISH TO INSTAGRAM
-        logger.info(f"[PUBLISH] Posting to Instagram...")
-        media_id = post_to_instagram(image_url, post.content or "", user_id, token)
+        logger.debug("[PUBLISH] Posting to Instagram...")
+        media_id = await post_to_instagram(image_url, post.content or "", user_id, token)
         
         # 5. SUCCESS: UPDATE POST
-        post.status = "published"
-        # Merge new settings safely
-        current_settings = post.platform_settings or {}
-        post.platform_settings = {**current_settings, "instagram_media_id": media_id}
-        
-        post.last_publish_attempt_at = now
-        post.last_error = None
-        db.commit()
+        await asyncio.to_thread(
+            _set_status, db, post, "published",
+            platform_settings={**(post.platform_settings or {}), "instagram_media_id": media_id},
+            last_publish_attempt_at=now,
+            last_error=None,
+        )
         
-        logger.info(f"[PUBLISH] ✓ Post published successfully, media ID: {media_id}")
+        logger.info("[PUBLISH] ✓ Post published successfully, media ID: %s", media_id)
         return media_id
         
     except Exception as e:
         # FAILURE: UPDATE POST
         error_msg = str(e)[:1000]
-        logger.error(f"[PUBLISH] ✗ Failed to publish post: {error_msg}")
+        if isinstance(e, (PublishError, CredentialsError, InstagramAPIError, httpx.HTTPError)):
+            # Expected failures (rate limits, bad media, network); the message says it all
+            logger.error("[PUBLISH] ✗ Failed to publish post: %s", error_msg)
+        else:
+            logger.error("[PUBLISH] ✗ Unexpected error publishing post: %s", error_msg)
+            logger.debug("[PUBLISH] Traceback for post %s", post.id, exc_info=True)
         
         # Only update status to failed if we aren't already published (race condition check)
         if post.status != "published":
-            post.status = "failed"
-            post.last_publish_attempt_at = now
-            post.last_error = error_msg
             try:
-                db.commit()
+                await asyncio.to_thread(_set_status, db, post, "failed", last_publish_attempt_at=now, last_error=error_msg)
             except:
                 db.rollback()
         
         raise  # Re-raise so caller knows it failed
 
 
+async def publish_post_in_background(post_id: int) -> None:
+    """
+    Publish a post outside the request that queued it (manual publish endpoint).
+    Uses its own session; the outcome is recorded on the post by publish_post_now.
+    """
+    if post_id in _inflight_posts:
+        logger.warning("[PUBLISH] Post %s is already being published, skipping", post_id)
+        return
+    _inflight_posts.add(post_id)
+    
+    db = SessionLocal()
+    try:
+        post = await asyncio.to_thread(db.get, models.Post, post_id)
+        if not post:
+            logger.warning("[PUBLISH] Post %s disappeared before background publish", post_id)
+            return
+        await publish_post_now(db, post)
+    except Exception as e:
+        # Already logged and stored in post.last_error by publish_post_now
+        logger.error("[PUBLISH] ✗ Background publish failed for post %s: %s", post_id, str(e)[:200])
+    finally:
+        db.close()
+        _inflight_posts.discard(post_id)
+
+
 def start_scheduler(app, interval_seconds: Optional[int] = None):
     """
     Start the background scheduler task.
@@ -274,7 +522,7 @@ def start_scheduler(app, interval_seconds: Optional[int] = None):
         app: FastAPI application instance
         interval_seconds: How often to check for due posts (overrides env var if provided)
     """
-    global _scheduler_task
+    global _scheduler_task, _scheduler_event_loop
     
     # Check if scheduler is enabled
     enabled_str = os.getenv("SCHEDULER_ENABLED", "true").lower()
@@ -289,9 +537,15 @@ def start_scheduler(app, interval_seconds: Optional[int] = None):
         logger.warning("[SCHEDULER] Already running, skipping start")
         return
     
+    # Only one worker process runs the scheduler
+    if not _acquire_scheduler_lock():
+        logger.info("[SCHEDULER] Another worker holds the scheduler lock, not starting in pid %s", os.getpid())
+        return
+    
     # Get interval from env if not provided
     if interval_seconds is None:
         interval_seconds = int(os.getenv("SCHEDULER_INTERVAL_SECONDS", "30"))
     
-    logger.info(f"[SCHEDULER] Starting scheduler with interval: {interval_seconds}s")
+    logger.info("[SCHEDULER] Starting scheduler with interval: %ss", interval_seconds)
+    _scheduler_event_loop = asyncio.get_running_loop()
     _scheduler_task = asyncio.create_task(scheduler_loop(interval_seconds))
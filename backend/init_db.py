@@ -0,0 +1,15 @@
+"""
+One-shot schema setup.
+Run from the backend directory once per deploy: python init_db.py
+"""
+
+from dotenv import load_dotenv
+
+# Load DATABASE_URL from .env before app.database creates its engine
+load_dotenv()
+
+from app.database import init_db
+
+if __name__ == "__main__":
+    init_db()
+    print("Database tables created")
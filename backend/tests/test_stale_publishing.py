@@ -0,0 +1,77 @@
+"""
+Abandoned publishes: a post left in "publishing" by a crash or restart must not stay stuck.
+Run from the backend directory: python -m unittest discover tests
+"""
+
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+# Point the app at a throwaway database before app.database creates its engine
+_db_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir.name, 'test.db')}"
+os.environ["SCHEDULER_ENABLED"] = "false"
+
+from unittest import mock
+
+from fastapi.testclient import TestClient
+
+from app.database import SessionLocal, init_db
+from app.main import app
+from app.models import models
+from app.services import scheduler
+
+
+class StalePublishingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        init_db()
+
+    def _publishing_post(self, started_ago: timedelta) -> int:
+        """A post claimed for publishing `started_ago`, with no task left working on it."""
+        db = SessionLocal()
+        try:
+            post = models.Post(
+                content="caption",
+                media_assets=[],
+                channels=[],
+                status="publishing",
+                last_publish_attempt_at=datetime.now(timezone.utc) - started_ago,
+            )
+            db.add(post)
+            db.commit()
+            return post.id
+        finally:
+            db.close()
+
+    def _status(self, post_id: int) -> str:
+        db = SessionLocal()
+        try:
+            return db.get(models.Post, post_id).status
+        finally:
+            db.close()
+
+    def test_scheduler_fails_abandoned_publish(self):
+        stale_id = self._publishing_post(timedelta(seconds=scheduler.PUBLISHING_STALE_SECONDS + 60))
+        running_id = self._publishing_post(timedelta(seconds=30))
+
+        scheduler._probe_next_due(30)
+
+        self.assertEqual(self._status(stale_id), "failed")
+        self.assertEqual(self._status(running_id), "publishing")
+
+    def test_manual_publish_reclaims_abandoned_publish(self):
+        stale_id = self._publishing_post(timedelta(seconds=scheduler.PUBLISHING_STALE_SECONDS + 60))
+        running_id = self._publishing_post(timedelta(seconds=30))
+
+        async def publish_in_background(post_id):
+            pass
+
+        with mock.patch.object(scheduler, "publish_post_in_background", publish_in_background), TestClient(app) as client:
+            self.assertEqual(client.post(f"/api/posts/{stale_id}/publish").status_code, 202)
+            self.assertEqual(client.post(f"/api/posts/{running_id}/publish").status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -47,14 +47,21 @@ export default function AssetsPage() {
 
     const fetchAssets = async () => {
         try {
-            const res = await fetch('http://localhost:8000/api/assets/');
-            if (res.ok) {
-                const data = await res.json();
-                setAssets(data);
-            } else {
-                console.error("Failed to fetch assets:", res.statusText);
-                setError(`Failed to load assets: ${res.status} ${res.statusText}`);
+            // The backend pages /api/assets/, so keep requesting until a short page comes back
+            const pageSize = 500;
+            const allAssets: Asset[] = [];
+            for (let offset = 0; ; offset += pageSize) {
+                const res = await fetch(`http://localhost:8000/api/assets/?limit=${pageSize}&offset=${offset}`);
+                if (!res.ok) {
+                    console.error("Failed to fetch assets:", res.statusText);
+                    setError(`Failed to load assets: ${res.status} ${res.statusText}`);
+                    return;
+                }
+                const page = await res.json();
+                allAssets.push(...page);
+                if (page.length < pageSize) break;
             }
+            setAssets(allAssets);
         } catch (error: any) {
             console.error("Failed to fetch assets", error);
             if (error.message?.includes('Failed to fetch') || error.message?.includes('NetworkError')) {
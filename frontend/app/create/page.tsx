@@ -141,13 +141,10 @@ export default function CreatePage() {
 
             if (status === 'published') {
                 try {
-                    const pubData = await postsApi.publish(data.id) as { mock?: boolean };
-
-                    if (pubData.mock) {
-                        toast.warning("Post simulated! (Localhost mode)");
-                    } else {
-                        toast.success("Post published successfully to Instagram!");
-                    }
+                    await postsApi.publish(data.id);
+                    toast.info("Publishing to Instagram...");
+                    await postsApi.waitForPublish(data.id);
+                    toast.success("Post published successfully to Instagram!");
                 } catch (pubError: any) {
                     const errorMsg = pubError.message || "Publishing failed";
 
@@ -35,6 +35,20 @@ async function apiFetch<T>(
   }
 }
 
+// Fetch every page of a limit/offset list endpoint, stopping at the first short page
+async function apiFetchAllPages<T>(endpoint: string, pageSize: number): Promise<T[]> {
+  const items: T[] = [];
+  const separator = endpoint.includes('?') ? '&' : '?';
+
+  for (let offset = 0; ; offset += pageSize) {
+    const page = await apiFetch<T[]>(`${endpoint}${separator}limit=${pageSize}&offset=${offset}`);
+    items.push(...page);
+    if (page.length < pageSize) {
+      return items;
+    }
+  }
+}
+
 // Profile API
 export const profileApi = {
   getOverview: async (platform: string, channelId?: number) => {
@@ -91,10 +105,17 @@ export const commentsApi = {
     });
   },
 
-  postReply: async (commentId: number, replyText: string) => {
+  postReply: async (commentId: number, replyText: string, background: boolean = false) => {
     return apiFetch(`/api/comments/${commentId}/reply`, {
       method: 'POST',
-      body: JSON.stringify({ reply_text: replyText }),
+      body: JSON.stringify({ reply_text: replyText, background }),
+    });
+  },
+
+  hideComment: async (commentId: number, hidden: boolean = true) => {
+    return apiFetch(`/api/comments/${commentId}/hide`, {
+      method: 'POST',
+      body: JSON.stringify({ hidden }),
     });
   },
 
@@ -150,6 +171,22 @@ export const postsApi = {
     });
   },
 
+  // Publishing runs in the background; poll the post until it is published or failed
+  waitForPublish: async (postId: number, intervalMs: number = 3000, timeoutMs: number = 300000) => {
+    const deadline = Date.now() + timeoutMs;
+    while (Date.now() < deadline) {
+      const post = await apiFetch<{ status: string; last_error?: string | null }>(`/api/posts/${postId}`);
+      if (post.status === 'published') {
+        return post;
+      }
+      if (post.status === 'failed') {
+        throw new Error(post.last_error || 'Publishing failed');
+      }
+      await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    }
+    throw new Error('Publishing is taking longer than expected. Check the post status later.');
+  },
+
   schedule: async (postId: number, scheduledTime: string) => {
     return apiFetch(`/api/posts/${postId}/schedule`, {
       method: 'POST',
@@ -184,7 +221,7 @@ export const connectorsApi = {
 // Assets API
 export const assetsApi = {
   getAll: async () => {
-    return apiFetch(`/api/assets/`);
+    return apiFetchAllPages(`/api/assets/`, 500);
   },
 
   generate: async (prompt: string, numImages: number = 4) => {
@@ -234,4 +271,11 @@ export const aiApi = {
       body: JSON.stringify({ content }),
     });
   },
+
+  postPackage: async (prompt: string, platforms: string[], tone?: string) => {
+    return apiFetch(`/api/ai/post-package`, {
+      method: 'POST',
+      body: JSON.stringify({ prompt, platforms, tone }),
+    });
+  },
 };
@@ -1,5 +1,10 @@
 import sqlite3
 import os
+import re
+
+# Only plain identifiers and known column types are interpolated into ALTER TABLE
+IDENTIFIER = re.compile(r"^[a-z_][a-z0-9_]*$")
+COLUMN_TYPES = {"DATETIME", "TEXT", "INTEGER", "BOOLEAN"}
 
 def migrate():
     db_path = os.path.join('backend', 'velvet_queue.db')
@@ -7,29 +12,56 @@ def migrate():
         print(f"Database {db_path} not found. Nothing to migrate.")
         return
         
-    conn = sqlite3.connect(db_path)
+    # Autocommit mode: the explicit BEGIN below makes every change one transaction
+    conn = sqlite3.connect(db_path, isolation_level=None)
     cursor = conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
     
     columns_to_add = [
-        ("approved_at", "DATETIME"),
-        ("approved_by", "TEXT"),
-        ("rejected_at", "DATETIME"),
-        ("rejected_by", "TEXT"),
-        ("rejection_reason", "TEXT"),
-        ("last_publish_attempt_at", "DATETIME"),
-        ("last_error", "TEXT")
+        ("posts", "approved_at", "DATETIME"),
+        ("posts", "approved_by", "TEXT"),
+        ("posts", "rejected_at", "DATETIME"),
+        ("posts", "rejected_by", "TEXT"),
+        ("posts", "rejection_reason", "TEXT"),
+        ("posts", "last_publish_attempt_at", "DATETIME"),
+        ("posts", "last_error", "TEXT"),
+        ("assets", "public_url", "TEXT"),
     ]
     
     print(f"Running migration on {db_path}...")
     
-    for col_name, col_type in columns_to_add:
+    existing_columns = {
+        table: {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}
+        for table in ("posts", "assets")
+    }
+    
+    cursor.execute("BEGIN")
+    for table, col_name, col_type in columns_to_add:
+        if not IDENTIFIER.match(col_name) or col_type not in COLUMN_TYPES:
+            raise ValueError(f"Refusing to add column {col_name!r} of type {col_type!r}")
+        if col_name in existing_columns[table]:
+            print(f"ℹ️ Column {table}.{col_name} already exists")
+            continue
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {col_name} {col_type}")
+        print(f"✅ Added column {table}.{col_name}")
+            
+    indexes_to_add = [
+        ("ix_comments_post_created", "CREATE INDEX IF NOT EXISTS ix_comments_post_created ON comments (post_id, created_at)"),
+        ("ix_comments_platform_extid", "CREATE UNIQUE INDEX IF NOT EXISTS ix_comments_platform_extid ON comments (platform, external_comment_id)"),
+        ("ix_channels_platform_name", "CREATE UNIQUE INDEX IF NOT EXISTS ix_channels_platform_name ON channels (platform, name)"),
+        ("ix_posts_created_at", "CREATE INDEX IF NOT EXISTS ix_posts_created_at ON posts (created_at)"),
+        ("ix_posts_status_scheduled", "CREATE INDEX IF NOT EXISTS ix_posts_status_scheduled ON posts (status, scheduled_time)"),
+    ]
+    
+    for index_name, ddl in indexes_to_add:
         try:
-            cursor.execute(f"ALTER TABLE posts ADD COLUMN {col_name} {col_type}")
-            print(f"✅ Added column {col_name}")
-        except sqlite3.OperationalError:
-            print(f"ℹ️ Column {col_name} already exists")
+            cursor.execute(ddl)
+            print(f"✅ Ensured index {index_name}")
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not create index {index_name}: {e}")
             
-    conn.commit()
+    cursor.execute("COMMIT")
     conn.close()
     print("Migration complete!")
 